@@ -0,0 +1,2 @@
+"""Benchmarks of the tap against a local mock of the Adyen report server."""
+# -*- coding: utf-8 -*-
@@ -0,0 +1,440 @@
+"""Micro-benchmarks of the cleaners and the csv parsing.
+
+Every benchmark runs on fixed synthetic reports and is reported as
+microseconds per operation: per value for the converters, per row for the
+cleaners and the csv readers. The results are compared against
+benchmarks/baseline.json. Both are scaled by a pure Python calibration loop,
+so that a baseline recorded on another machine stays comparable.
+
+Usage:
+    python -m benchmarks.micro --check
+    python -m benchmarks.micro --update
+"""
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import gc
+import io
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.reports import REPORT_NAMES, generate_report, report_keys
+from tap_adyen.adyen import iter_lines
+from tap_adyen.cleaners import (
+    CLEANER_COMPILERS,
+    CLEANERS,
+    DATE_TIMEZONES,
+    clean_row,
+    to_type_or_null,
+)
+from tap_adyen.streams import STREAMS, date_parser
+
+BASELINE_PATH: str = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Rows per report of the corpora
+CORPUS_ROWS: int = 1000
+
+# Size of the text chunks that are split into lines
+CHUNK_SIZE: int = 65536
+
+# Values per converter benchmark
+CONVERTER_VALUES: Dict[str, Tuple[object, List[str]]] = {
+    'Decimal': (Decimal, ['1234.56', '0.10', '99999.99', '-12.00']),
+    'int': (int, ['0', '42', '1234567', '-7']),
+    'bool': (bool, ['true', 'false', 'true', 'false']),
+    'date_parser': (date_parser, [
+        '2021-03-01 10:15:00 CET',
+        '2021-07-14 23:59:59 CEST',
+        '2021-12-31 00:00:00 UTC',
+        '2021-01-01 12:30:45 EST',
+    ]),
+    'date_parser_dateutil': (date_parser, [
+        '2021-03-01T10:15:00 CET',
+        'March 1 2021 10:15 CEST',
+        '2021/12/31 00:00:00 UTC',
+        '01-01-2021 12:30:45 EST',
+    ]),
+    'null': (Decimal, ['', '', '', '']),
+}
+
+# A benchmark prepares its input outside of the timing, then runs it and
+# returns the number of operations
+Benchmark = Tuple[Callable[[], object], Callable[[object], int]]
+
+
+class Corpus(object):
+    """Synthetic report of a stream, in the forms the tap reads it."""
+
+    def __init__(self, stream_name: str, rows: int) -> None:
+        """Initialize corpus.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            rows {int} -- Number of rows
+        """
+        key: str = report_keys(stream_name, 1)[0]
+        self.stream_name: str = stream_name
+        self.csv_url: str = (
+            'https://ca-test.adyen.com/reports/download/MerchantAccount/'
+            f'merchant_account/{REPORT_NAMES[stream_name].format(key=key)}'
+        )
+        self.text: str = generate_report(stream_name, key, rows).decode()
+        self.chunks: List[str] = [
+            self.text[start:start + CHUNK_SIZE]
+            for start in range(0, len(self.text), CHUNK_SIZE)
+        ]
+
+        lines: List[List[str]] = list(csv.reader(io.StringIO(self.text)))
+        self.header: List[str] = lines[0]
+        self.rows: List[List[str]] = lines[1:]
+        self.records: List[dict] = list(
+            csv.DictReader(io.StringIO(self.text)),
+        )
+
+
+def converter_benchmark(
+    data_type: object,
+    input_values: List[str],
+) -> Benchmark:
+    """Benchmark to_type_or_null on values of a type.
+
+    Arguments:
+        data_type {object} -- Data type or function
+        input_values {List[str]} -- Values to convert
+
+    Returns:
+        Benchmark -- Benchmark, one operation per value
+    """
+    values: List[str] = input_values * 250  # noqa: WPS435
+
+    def run(_: object) -> int:  # noqa: WPS430
+        for input_value in values:
+            to_type_or_null(input_value, data_type)
+        return len(values)
+
+    return (lambda: None), run
+
+
+def cleaner_benchmark(corpus: Corpus) -> Benchmark:
+    """Benchmark the cleaner of a stream on csv rows read as dicts.
+
+    Arguments:
+        corpus {Corpus} -- Report of the stream
+
+    Returns:
+        Benchmark -- Benchmark, one operation per row
+    """
+    cleaner: Callable = CLEANERS[corpus.stream_name]
+
+    # The cleaners change the rows they clean
+    def prepare() -> List[dict]:  # noqa: WPS430
+        return [dict(record) for record in corpus.records]
+
+    def run(records: List[dict]) -> int:  # noqa: WPS430
+        for row_number, row in enumerate(records):
+            cleaner(row, row_number, corpus.csv_url)
+        return len(records)
+
+    return prepare, run
+
+
+def compiled_benchmark(corpus: Corpus) -> Benchmark:
+    """Benchmark the compiled cleaner of a stream on plain csv rows.
+
+    Arguments:
+        corpus {Corpus} -- Report of the stream
+
+    Returns:
+        Benchmark -- Benchmark, one operation per row
+    """
+    clean: Callable = CLEANER_COMPILERS[corpus.stream_name](
+        corpus.header,
+        corpus.csv_url,
+    )
+
+    def prepare() -> List[List[str]]:  # noqa: WPS430
+        return [list(row) for row in corpus.rows]
+
+    def run(rows: List[List[str]]) -> int:  # noqa: WPS430
+        for row_number, row in enumerate(rows):
+            clean(row, row_number)
+        return len(rows)
+
+    return prepare, run
+
+
+def clean_row_benchmark(corpus: Corpus) -> Benchmark:
+    """Benchmark clean_row on rows that were prepared like the cleaners do.
+
+    Arguments:
+        corpus {Corpus} -- Report of the stream
+
+    Returns:
+        Benchmark -- Benchmark, one operation per row
+    """
+    mapping: dict = STREAMS[corpus.stream_name]['mapping']
+    dates: dict = DATE_TIMEZONES[corpus.stream_name]
+
+    rows: List[dict] = []
+    for row_number, record in enumerate(corpus.records):
+        row: dict = dict(record, id=row_number)
+        for date_column, timezone_column in dates.items():
+            row[date_column] = f'{row[date_column]} {row[timezone_column]}'
+        rows.append(row)
+
+    def run(_: object) -> int:  # noqa: WPS430
+        for row in rows:
+            clean_row(row, mapping)
+        return len(rows)
+
+    return (lambda: None), run
+
+
+def parse_benchmark(corpus: Corpus, csv_reader: Callable) -> Benchmark:
+    """Benchmark reading the csv of a report from text chunks.
+
+    Arguments:
+        corpus {Corpus} -- Report of the stream
+        csv_reader {Callable} -- csv.reader or csv.DictReader
+
+    Returns:
+        Benchmark -- Benchmark, one operation per row
+    """
+
+    def run(_: object) -> int:  # noqa: WPS430
+        rows: int = 0
+        for _row in csv_reader(iter_lines(corpus.chunks), delimiter=','):
+            rows += 1
+        return rows
+
+    return (lambda: None), run
+
+
+def calibration_benchmark() -> Benchmark:
+    """Benchmark a pure Python loop, the unit of the scaled results.
+
+    Returns:
+        Benchmark -- Benchmark, one operation per iteration
+    """
+
+    def run(_: object) -> int:  # noqa: WPS430
+        total: int = 0
+        for number in range(100000):  # noqa: WPS432
+            total += number % 7
+        return 100000  # noqa: WPS432
+
+    return (lambda: None), run
+
+
+def benchmarks() -> Dict[str, Benchmark]:
+    """Create all benchmarks.
+
+    Returns:
+        Dict[str, Benchmark] -- Benchmark per name
+    """
+    cases: Dict[str, Benchmark] = {'calibration': calibration_benchmark()}
+
+    for type_name, (data_type, input_values) in CONVERTER_VALUES.items():
+        cases[f'to_type_or_null.{type_name}'] = converter_benchmark(
+            data_type,
+            input_values,
+        )
+
+    for stream_name in CLEANERS:
+        corpus: Corpus = Corpus(stream_name, CORPUS_ROWS)
+        cases[f'cleaner.{stream_name}'] = cleaner_benchmark(corpus)
+        cases[f'compiled_cleaner.{stream_name}'] = compiled_benchmark(corpus)
+        cases[f'clean_row.{stream_name}'] = clean_row_benchmark(corpus)
+        cases[f'csv.reader.{stream_name}'] = parse_benchmark(
+            corpus,
+            csv.reader,
+        )
+        cases[f'csv.DictReader.{stream_name}'] = parse_benchmark(
+            corpus,
+            csv.DictReader,
+        )
+
+    return cases
+
+
+def measure(benchmark: Benchmark, repeats: int) -> float:
+    """Measure a benchmark, keeping the fastest of the repeats.
+
+    Arguments:
+        benchmark {Benchmark} -- Benchmark
+        repeats {int} -- Number of runs
+
+    Returns:
+        float -- Microseconds per operation
+    """
+    prepare, run = benchmark
+    fastest: Optional[float] = None
+
+    for _ in range(repeats):
+        prepared: object = prepare()
+
+        # Like timeit, garbage collection does not disturb the timing
+        gc.disable()
+        try:
+            started: float = time.perf_counter()
+            operations: int = run(prepared)
+            elapsed: float = time.perf_counter() - started
+        finally:
+            gc.enable()
+
+        per_operation: float = elapsed / operations
+        if fastest is None or per_operation < fastest:
+            fastest = per_operation
+
+    return (fastest or 0) * 1e6
+
+
+def compare(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float,
+) -> List[str]:
+    """Compare results against a baseline, scaled by their calibration.
+
+    Arguments:
+        results {Dict[str, float]} -- Microseconds per operation per name
+        baseline {Dict[str, float]} -- Baseline of the results
+        tolerance {float} -- Allowed slowdown, 0.25 is 25 percent
+
+    Returns:
+        List[str] -- Names of the benchmarks that regressed
+    """
+    scale: float = results['calibration'] / baseline['calibration']
+
+    regressions: List[str] = []
+    for name, result in results.items():
+        if name == 'calibration' or name not in baseline:
+            continue
+        if result / scale > baseline[name] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # noqa: WPS210
+    """Run the micro-benchmarks from the command line.
+
+    Keyword Arguments:
+        argv {Optional[List[str]]} -- Arguments (default: {None})
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Micro-benchmarks of the cleaners and csv parsing.',
+    )
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument(
+        '--filter',
+        default='',
+        help='Only run benchmarks with this text in their name',
+    )
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Allowed slowdown against the baseline (default: 0.25)',
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Exit with an error when a benchmark regressed',
+    )
+    parser.add_argument(
+        '--update',
+        action='store_true',
+        help='Write the results as the new baseline',
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    cases: Dict[str, Benchmark] = benchmarks()
+    calibration: Benchmark = cases.pop('calibration')
+
+    # The calibration is measured between all benchmarks, the fastest run
+    # is the least disturbed by other processes and CPU frequency changes
+    results: Dict[str, float] = {
+        'calibration': measure(calibration, args.repeats),
+    }
+    for name, benchmark in cases.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(benchmark, args.repeats)
+        results['calibration'] = min(
+            results['calibration'],
+            measure(calibration, args.repeats),
+        )
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    _print_table(results, baseline)
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        return
+
+    regressions: List[str] = []
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+    for name in regressions:
+        print(f'Regression: {name}', file=sys.stderr)
+    if args.check and regressions:
+        sys.exit(1)
+
+
+def _print_table(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+) -> None:
+    """Print the results and their change against the baseline.
+
+    Arguments:
+        results {Dict[str, float]} -- Microseconds per operation per name
+        baseline {Dict[str, float]} -- Baseline of the results
+    """
+    scale: float = 1
+    if 'calibration' in baseline:
+        scale = results['calibration'] / baseline['calibration']
+
+    row: Callable[..., str] = partial('{0:<50} {1:>12} {2:>12} {3:>8}'.format)
+    print(row('benchmark', 'us/op', 'baseline', 'change'))
+    for name, result in results.items():
+        change: str = ''
+        if name in baseline and name != 'calibration':
+            change = f'{(result / scale / baseline[name] - 1) * 100:+.0f}%'
+        print(row(
+            name,
+            f'{result:.3f}',
+            _format_baseline(baseline.get(name)),
+            change,
+        ))
+
+
+def _format_baseline(result: Optional[float]) -> str:
+    """Format a baseline result.
+
+    Arguments:
+        result {Optional[float]} -- Microseconds per operation
+
+    Returns:
+        str -- Formatted result, empty without baseline
+    """
+    if result is None:
+        return ''
+    return f'{result:.3f}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""Synthetic Adyen reports."""
+# -*- coding: utf-8 -*-
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from tap_adyen.streams import STREAMS, date_parser
+
+# Report file names of every stream, the key is a date or batch number
+REPORT_NAMES: Dict[str, str] = {
+    'dispute_transaction_details': 'dispute_report_{key}.csv',
+    'payment_accounting': 'payments_accounting_report_{key}.csv',
+    'settlement_details': 'settlement_detail_report_batch_{key}.csv',
+}
+
+# Bookmarks of the first report of every stream
+FIRST_REPORTS: Dict[str, dict] = {
+    'dispute_transaction_details': {'start_date': '2021-01-01'},
+    'payment_accounting': {'start_date': '2021-01-01'},
+    'settlement_details': {'batch_number': 1},
+}
+
+TIMEZONES: tuple = ('CET', 'CEST', 'UTC', 'EST', 'PST', 'JST')
+CURRENCIES: tuple = ('EUR', 'USD', 'GBP', 'SEK', 'JPY')
+RECORD_TYPES: tuple = (
+    'Settled',
+    'Refunded',
+    'Chargeback',
+    'Authorised',
+    'SentForSettle',
+)
+
+# Share of nullable values that are left empty
+EMPTY_RATE: float = 0.15
+
+
+def report_keys(stream_name: str, reports: int) -> List[str]:
+    """Return the dates or batch numbers of the reports of a stream.
+
+    Arguments:
+        stream_name {str} -- Stream name
+        reports {int} -- Number of reports
+
+    Returns:
+        List[str] -- Date or batch number per report
+    """
+    if stream_name == 'settlement_details':
+        first_batch: int = FIRST_REPORTS[stream_name]['batch_number']
+        return [str(first_batch + offset) for offset in range(reports)]
+
+    first_date: datetime = datetime.strptime(
+        FIRST_REPORTS[stream_name]['start_date'],
+        '%Y-%m-%d',
+    )
+    return [
+        (first_date + timedelta(days=offset)).strftime('%Y_%m_%d')
+        for offset in range(reports)
+    ]
+
+
+def generate_report(
+    stream_name: str,
+    key: str,
+    rows: int,
+    seed: int = 0,
+) -> bytes:
+    """Generate the CSV of a report.
+
+    The columns are the columns of the stream mapping. The values match the
+    type of their column, nullable columns are sometimes empty.
+
+    Arguments:
+        stream_name {str} -- Stream name
+        key {str} -- Date or batch number of the report
+        rows {int} -- Number of rows
+
+    Keyword Arguments:
+        seed {int} -- Seed of the random values (default: {0})
+
+    Returns:
+        bytes -- CSV report, encoded as UTF-8
+    """
+    randomizer: random.Random = random.Random(f'{seed}-{stream_name}-{key}')
+    mapping: dict = STREAMS[stream_name]['mapping']
+
+    # The id is not a column of the report, the tap adds it
+    header: List[str] = [column for column in mapping if column != 'id']
+    generators: List[Callable[[], str]] = [
+        _value_generator(randomizer, column, mapping[column], key)
+        for column in header
+    ]
+
+    output: io.StringIO = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(header)
+    for _ in range(rows):
+        writer.writerow([generate() for generate in generators])
+
+    return output.getvalue().encode('utf-8')
+
+
+def _value_generator(  # noqa: WPS231
+    randomizer: random.Random,
+    column: str,
+    column_mapping: dict,
+    key: str,
+) -> Callable[[], str]:
+    """Create a generator of the values of a column.
+
+    Arguments:
+        randomizer {random.Random} -- Random generator
+        column {str} -- Column name
+        column_mapping {dict} -- Mapping of the column
+        key {str} -- Date or batch number of the report
+
+    Returns:
+        Callable[[], str] -- Returns a random value
+    """
+    data_type: object = column_mapping.get('type')
+    generate: Callable[[], str]
+
+    if column == 'Batch Number':
+        return lambda: key
+    elif data_type is Decimal:
+        def generate() -> str:  # noqa: WPS430
+            return f'{randomizer.uniform(0, 5000):.2f}'
+    elif data_type is int:
+        def generate() -> str:  # noqa: WPS430
+            return str(randomizer.randint(0, 100))
+    elif data_type is bool:
+        def generate() -> str:  # noqa: WPS430
+            return randomizer.choice(('true', 'false'))
+    elif data_type is date_parser:
+        def generate() -> str:  # noqa: WPS430
+            return (
+                datetime(2021, 1, 1) + timedelta(  # noqa: WPS432
+                    seconds=randomizer.randrange(31536000),
+                )
+            ).strftime('%Y-%m-%d %H:%M:%S')
+    elif 'TimeZone' in column:
+        def generate() -> str:  # noqa: WPS430
+            return randomizer.choice(TIMEZONES)
+    elif 'Currency' in column:
+        def generate() -> str:  # noqa: WPS430
+            return randomizer.choice(CURRENCIES)
+    elif column in {'Type', 'Record Type'}:
+        def generate() -> str:  # noqa: WPS430
+            return randomizer.choice(RECORD_TYPES)
+    else:
+        def generate() -> str:  # noqa: WPS430
+            return ''.join(randomizer.choices(
+                'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+                k=randomizer.randint(8, 24),
+            ))
+
+    # Values that are not required are sometimes empty. Dates always have a
+    # timezone in the reports, they are not left empty.
+    if data_type is date_parser or not column_mapping.get('null', True):
+        return generate
+
+    def generate_nullable() -> str:  # noqa: WPS430
+        if randomizer.random() < EMPTY_RATE:
+            return ''
+        return generate()
+
+    return generate_nullable
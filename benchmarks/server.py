@@ -0,0 +1,190 @@
+"""Mock Adyen report server."""
+# -*- coding: utf-8 -*-
+import hashlib
+import sys
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from benchmarks.reports import REPORT_NAMES, generate_report, report_keys
+
+# Path of the reports of a merchant account
+MERCHANT_PATH: str = '/reports/download/MerchantAccount/{merchant}/'
+
+
+class MockAdyen(object):
+    """Local HTTP server that serves synthetic reports like Adyen.
+
+    Reports are served under the same paths as the Adyen report download
+    API, for every stream. Every response is delayed by latency seconds.
+    The server counts the requests and the bytes sent per stream.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        merchant: str = 'merchant_account',
+        reports: int = 3,
+        rows: int = 10000,
+        latency: float = 0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize mock server, generating all reports up front.
+
+        Keyword Arguments:
+            merchant {str} -- Merchant account (default: {'merchant_account'})
+            reports {int} -- Number of reports per stream (default: {3})
+            rows {int} -- Number of rows per report (default: {10000})
+            latency {float} -- Seconds to delay every response (default: {0})
+            seed {int} -- Seed of the report values (default: {0})
+        """
+        self.latency: float = latency
+        self.prefix: str = MERCHANT_PATH.format(merchant=merchant)
+
+        # Report body and stream per report file name
+        self.reports: Dict[str, Tuple[str, bytes]] = {}
+        for stream_name, report_name in REPORT_NAMES.items():
+            for key in report_keys(stream_name, reports):
+                self.reports[report_name.format(key=key)] = (
+                    stream_name,
+                    generate_report(stream_name, key, rows, seed),
+                )
+
+        self.last_modified: str = formatdate(usegmt=True)
+        self.stats: Counter = Counter()
+        self.lock: threading.Lock = threading.Lock()
+        self.server: Optional[ReportServer] = None
+
+    @property
+    def port(self) -> int:
+        """Return the port the server listens on.
+
+        Returns:
+            int -- Port
+        """
+        return self.server.server_address[1]  # type: ignore
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        mock: MockAdyen = self
+
+        class Handler(ReportHandler):  # noqa: WPS431
+            adyen: MockAdyen = mock
+
+        self.server = ReportServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def report_bytes(self, stream_name: str) -> int:
+        """Return the total size of the reports of a stream.
+
+        Arguments:
+            stream_name {str} -- Stream name
+
+        Returns:
+            int -- Bytes
+        """
+        return sum(
+            len(body)
+            for report_stream, body in self.reports.values()
+            if report_stream == stream_name
+        )
+
+    def count(self, stream_name: str, name: str, amount: int = 1) -> None:
+        """Count a request or bytes sent.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            name {str} -- Name of the counter
+
+        Keyword Arguments:
+            amount {int} -- Amount to add (default: {1})
+        """
+        with self.lock:
+            self.stats[(stream_name, name)] += amount
+
+
+class ReportServer(ThreadingHTTPServer):
+    """HTTP server that ignores clients closing their connection."""
+
+    daemon_threads: bool = True
+
+    def handle_error(self, request: object, client_address: tuple) -> None:
+        """Report errors, except for connections closed by the client.
+
+        Arguments:
+            request {object} -- Request socket
+            client_address {tuple} -- Address of the client
+        """
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """Serve the reports of a mock server."""
+
+    protocol_version: str = 'HTTP/1.1'
+    adyen: MockAdyen
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        """Answer a HEAD request."""
+        self._respond(send_body=False)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Answer a GET request."""
+        self._respond(send_body=True)
+
+    def log_message(self, *args: object) -> None:
+        """Do not log requests."""
+
+    def _respond(self, send_body: bool) -> None:
+        """Answer a request for a report.
+
+        Arguments:
+            send_body {bool} -- Whether to send the report
+        """
+        if self.adyen.latency:
+            time.sleep(self.adyen.latency)
+
+        report: Optional[Tuple[str, bytes]] = None
+        if self.path.startswith(self.adyen.prefix):
+            report = self.adyen.reports.get(
+                self.path[len(self.adyen.prefix):],
+            )
+
+        # Reports that do not exist
+        if report is None:
+            self.send_response(404)  # noqa: WPS432
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        stream_name, body = report
+        self.adyen.count(stream_name, self.command)
+        etag: str = f'"{hashlib.md5(body).hexdigest()}"'  # noqa: S303
+
+        # Reports do not change, conditional requests are not modified
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)  # noqa: WPS432
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)  # noqa: WPS432
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.adyen.last_modified)
+        self.end_headers()
+
+        if send_body:
+            self.wfile.write(body)
+            self.adyen.count(stream_name, 'bytes', len(body))
@@ -0,0 +1,280 @@
+"""Startup benchmark.
+
+Launches the tap as a fresh process, the way it runs in short incremental
+runs, and reports the wall time until it exits. The scenarios are importing
+the tap, discovery, a sync without selected streams and a sync against a
+local mock of the Adyen report server that has no new reports.
+
+Usage:
+    python -m benchmarks.startup --repeats 10
+"""
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from functools import partial
+from statistics import median
+from typing import Dict, List, Optional
+
+from benchmarks.reports import FIRST_REPORTS
+from benchmarks.server import MockAdyen
+from tap_adyen.discover import discover
+
+MERCHANT: str = 'merchant_account'
+
+# Modules that are only needed to sync
+HEAVY_MODULES: tuple = (
+    'asyncio',
+    'httpx',
+    'pkg_resources',
+    'tap_adyen.cleaners',
+    'tap_adyen.streams',
+)
+
+# Runs the tap with the mock server as the Adyen test environment, the
+# first argument is the port of the mock server. The modules of HEAVY_MODULES
+# that were loaded are written to stderr at exit. Older versions of the tap
+# import the client up front and are pointed to the mock server right away.
+LAUNCHER: str = """
+import atexit, sys
+port = sys.argv.pop(1)
+atexit.register(lambda: sys.stderr.write('LOADED ' + ','.join(
+    name for name in {heavy!r} if name in sys.modules
+) + '\\n'))
+from tap_adyen import tap
+def mock():
+    import tap_adyen.adyen
+    tap_adyen.adyen.API_SCHEME = 'http://'
+    tap_adyen.adyen.API_BASE_URL_TEST = '127.0.0.1:' + port
+run_sync = getattr(tap, 'run_sync', None)
+def run_mocked(*args):
+    mock()
+    run_sync(*args)
+if run_sync is None:
+    mock()
+else:
+    tap.run_sync = run_mocked
+if len(sys.argv) > 1:
+    tap.main()
+""".format(heavy=HEAVY_MODULES)
+
+
+def write_files(directory: str) -> Dict[str, str]:
+    """Write the config, catalogs and state of the scenarios.
+
+    Arguments:
+        directory {str} -- Directory of the files
+
+    Returns:
+        Dict[str, str] -- Path per file
+    """
+    catalog: dict = discover().to_dict()
+    contents: Dict[str, dict] = {
+        'config': {
+            'start_date': '2021-01-01T00:00:00Z',
+            'report_user': 'report_user',
+            'company_account': 'company_account',
+            'user_password': 'user_password',
+            'merchant_account': MERCHANT,
+            'test': True,
+        },
+        'state': {
+            'bookmarks': {
+                stream_name: dict(bookmark)
+                for stream_name, bookmark in FIRST_REPORTS.items()
+            },
+        },
+        'unselected': _select(catalog, selected=False),
+        'selected': _select(catalog, selected=True),
+    }
+
+    paths: Dict[str, str] = {}
+    for name, content in contents.items():
+        paths[name] = os.path.join(directory, f'{name}.json')
+        with open(paths[name], 'w') as json_file:
+            json.dump(content, json_file)
+    return paths
+
+
+def _select(catalog: dict, selected: bool) -> dict:
+    """Return a copy of a catalog with every stream selected or not.
+
+    Arguments:
+        catalog {dict} -- Catalog
+        selected {bool} -- Whether the streams are selected
+
+    Returns:
+        dict -- Catalog
+    """
+    return {
+        'streams': [
+            dict(stream, schema=dict(stream['schema'], selected=selected))
+            for stream in catalog['streams']
+        ],
+    }
+
+
+def scenarios(paths: Dict[str, str]) -> Dict[str, List[str]]:
+    """Return the command line arguments of the tap per scenario.
+
+    Arguments:
+        paths {Dict[str, str]} -- Path per file
+
+    Returns:
+        Dict[str, List[str]] -- Arguments per scenario, empty to only import
+    """
+    config: List[str] = ['--config', paths['config']]
+    return {
+        'import': [],
+        'discover': [*config, '--discover'],
+        'sync_unselected': [*config, '--catalog', paths['unselected']],
+        'sync_no_new_reports': [
+            *config,
+            '--catalog',
+            paths['selected'],
+            '--state',
+            paths['state'],
+        ],
+    }
+
+
+def launch(
+    port: int,
+    arguments: List[str],
+    tree: Optional[str] = None,
+) -> Dict[str, object]:
+    """Run the tap once and time it.
+
+    Arguments:
+        port {int} -- Port of the mock server
+        arguments {List[str]} -- Command line arguments of the tap
+
+    Keyword Arguments:
+        tree {Optional[str]} -- Directory to import tap_adyen from, the
+            installed tap when None (default: {None})
+
+    Raises:
+        RuntimeError: The tap failed
+
+    Returns:
+        Dict[str, object] -- Seconds and the heavy modules that were loaded
+    """
+    environment: Dict[str, str] = dict(os.environ)
+    if tree:
+        environment['PYTHONPATH'] = os.pathsep.join(
+            path for path in (tree, environment.get('PYTHONPATH')) if path
+        )
+
+    started: float = time.perf_counter()
+    process: subprocess.CompletedProcess = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', LAUNCHER, str(port), *arguments],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    elapsed: float = time.perf_counter() - started
+    if process.returncode:
+        raise RuntimeError(f'The tap failed:\n{process.stderr}')
+
+    loaded: str = ''
+    for line in process.stderr.splitlines():
+        if line.startswith('LOADED '):
+            loaded = line[len('LOADED '):]
+    return {
+        'seconds': elapsed,
+        'loaded': [name for name in loaded.split(',') if name],
+    }
+
+
+def benchmark(
+    repeats: int,
+    tree: Optional[str] = None,
+) -> Dict[str, Dict[str, object]]:
+    """Time every scenario.
+
+    Arguments:
+        repeats {int} -- Launches per scenario
+
+    Keyword Arguments:
+        tree {Optional[str]} -- Directory to import tap_adyen from, the
+            installed tap when None (default: {None})
+
+    Returns:
+        Dict[str, Dict[str, object]] -- Measurements per scenario
+    """
+    server: MockAdyen = MockAdyen(MERCHANT, reports=0, rows=0)
+    server.start()
+
+    results: Dict[str, Dict[str, object]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths: Dict[str, str] = write_files(directory)
+            for name, arguments in scenarios(paths).items():
+                # The first launch warms the file system cache
+                launch(server.port, arguments, tree)
+
+                runs: List[Dict[str, object]] = [
+                    launch(server.port, arguments, tree)
+                    for _ in range(repeats)
+                ]
+                seconds: List[float] = [run['seconds'] for run in runs]
+                results[name] = {
+                    'min_ms': min(seconds) * 1000,
+                    'median_ms': median(seconds) * 1000,
+                    'loaded': runs[-1]['loaded'],
+                }
+    finally:
+        server.stop()
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line.
+
+    Keyword Arguments:
+        argv {Optional[List[str]]} -- Arguments (default: {None})
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Benchmark the startup time of the tap.',
+    )
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument(
+        '--tree',
+        metavar='PATH',
+        help=(
+            'Launch the tap_adyen package in this directory, e.g. a git '
+            'worktree of an older revision to compare with'
+        ),
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the results to a JSON file',
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, object]] = benchmark(args.repeats, args.tree)
+
+    row = partial('{0:<22} {1:>10} {2:>10}  {3}'.format)
+    print(row('scenario', 'min ms', 'median ms', 'heavy modules loaded'))
+    for name, result in results.items():
+        print(row(
+            name,
+            f'{result["min_ms"]:.0f}',
+            f'{result["median_ms"]:.0f}',
+            ', '.join(result['loaded']) or '-',  # type: ignore
+        ))
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""End-to-end sync benchmark.
+
+Runs tap_adyen.sync.sync for every stream against a local mock of the Adyen
+report server and reports the throughput, the probe latency and the peak
+memory use. Every stream is synced in a fresh process, so the peak RSS of a
+stream is not influenced by the others.
+
+Usage:
+    python -m benchmarks.sync --reports 3 --rows 20000 --latency 0.02
+"""
+# -*- coding: utf-8 -*-
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import time
+from functools import partial
+from multiprocessing.connection import Connection
+from statistics import mean
+from typing import Dict, List, Optional
+
+import httpx
+
+import tap_adyen.adyen
+from benchmarks.reports import FIRST_REPORTS, REPORT_NAMES
+from benchmarks.server import MockAdyen
+from tap_adyen.adyen import Adyen
+from tap_adyen.discover import discover
+from tap_adyen.sync import sync
+from tap_adyen.writer import RecordWriter
+
+MERCHANT: str = 'merchant_account'
+
+
+class TimedAdyen(Adyen):
+    """Adyen client that records the latency of its HEAD requests."""
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        """Initialize timed Adyen client.
+
+        Arguments:
+            args {object} -- Arguments of the Adyen client
+            kwargs {object} -- Keyword arguments of the Adyen client
+        """
+        super().__init__(*args, **kwargs)  # type: ignore
+        self.probe_latencies: List[float] = []
+
+    def _head_request(
+        self,
+        url: str,
+    ) -> httpx._models.Response:  # noqa: WPS437
+        """Perform a timed HEAD request.
+
+        Arguments:
+            url {str} -- Input url
+
+        Returns:
+            httpx._models.Response -- Response of HEAD request
+        """
+        started: float = time.perf_counter()
+        try:
+            return super()._head_request(url)
+        finally:
+            self.probe_latencies.append(time.perf_counter() - started)
+
+
+class CountingOutput(io.TextIOBase):
+    """Discards the tap output while counting it."""
+
+    def __init__(self) -> None:
+        """Initialize counting output."""
+        self.characters: int = 0
+        self.records: int = 0
+
+    def write(self, text: str) -> int:
+        """Count the characters and RECORD messages of a chunk of output.
+
+        Arguments:
+            text {str} -- Output
+
+        Returns:
+            int -- Number of characters written
+        """
+        self.characters += len(text)
+        self.records += text.count('{"type": "RECORD"')
+        return len(text)
+
+
+def run_stream(
+    stream_name: str,
+    port: int,
+    client_options: dict,
+) -> Dict[str, float]:
+    """Sync a single stream from the mock server.
+
+    Arguments:
+        stream_name {str} -- Stream name
+        port {int} -- Port of the mock server
+        client_options {dict} -- Keyword arguments of the Adyen client
+
+    Returns:
+        Dict[str, float] -- Measurements of the sync
+    """
+    # Singer resets the log level of every logger it hands out
+    logging.disable(logging.INFO)
+
+    # The mock server does not use TLS
+    tap_adyen.adyen.API_SCHEME = 'http://'
+
+    adyen: TimedAdyen = TimedAdyen(
+        'report_user',
+        'company_account',
+        'user_password',
+        MERCHANT,
+        True,
+        **client_options,
+    )
+    adyen.base_url = f'127.0.0.1:{port}'
+
+    catalog = discover()
+    for stream in catalog.streams:
+        stream.schema.selected = stream.tap_stream_id == stream_name
+
+    state: dict = {
+        'bookmarks': {stream_name: dict(FIRST_REPORTS[stream_name])},
+    }
+    output: CountingOutput = CountingOutput()
+
+    started: float = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        sync(adyen, state, catalog, '', writer=RecordWriter(output=output))
+    elapsed: float = time.perf_counter() - started
+
+    adyen.client.close()
+
+    latencies: List[float] = adyen.probe_latencies
+    return {
+        'seconds': elapsed,
+        'rows': output.records,
+        'output_bytes': output.characters,
+        'probes': len(latencies),
+        'probe_mean_ms': mean(latencies) * 1000 if latencies else 0,
+        'probe_p95_ms': _p95(latencies) * 1000 if latencies else 0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_in_process(
+    sender: Connection,
+    stream_name: str,
+    port: int,
+    client_options: dict,
+) -> None:
+    """Sync a single stream and send the measurements to the parent.
+
+    Arguments:
+        sender {Connection} -- Pipe to the parent process
+        stream_name {str} -- Stream name
+        port {int} -- Port of the mock server
+        client_options {dict} -- Keyword arguments of the Adyen client
+    """
+    try:
+        sender.send(run_stream(stream_name, port, client_options))
+    except Exception as error:
+        sender.send({'error': repr(error)})
+        raise
+    finally:
+        sender.close()
+
+
+def benchmark(  # noqa: WPS211
+    streams: List[str],
+    reports: int,
+    rows: int,
+    latency: float,
+    client_options: dict,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """Benchmark the sync of every stream.
+
+    Arguments:
+        streams {List[str]} -- Streams to sync
+        reports {int} -- Number of reports per stream
+        rows {int} -- Number of rows per report
+        latency {float} -- Seconds to delay every response
+        client_options {dict} -- Keyword arguments of the Adyen client
+
+    Keyword Arguments:
+        seed {int} -- Seed of the report values (default: {0})
+
+    Returns:
+        Dict[str, Dict[str, float]] -- Measurements per stream
+    """
+    server: MockAdyen = MockAdyen(MERCHANT, reports, rows, latency, seed)
+    server.start()
+
+    # A fresh process per stream, for a clean peak RSS
+    context = multiprocessing.get_context('spawn')
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for stream_name in streams:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_in_process,
+                args=(sender, stream_name, server.port, client_options),
+            )
+            process.start()
+            result: Dict[str, float] = receiver.recv()
+            process.join()
+            if 'error' in result:
+                raise RuntimeError(
+                    f'Sync of {stream_name} failed: {result["error"]}',
+                )
+
+            downloaded: int = server.stats[(stream_name, 'bytes')]
+            result['downloaded_bytes'] = downloaded
+            result['head_requests'] = server.stats[(stream_name, 'HEAD')]
+            result['get_requests'] = server.stats[(stream_name, 'GET')]
+            result['rows_per_second'] = result['rows'] / result['seconds']
+            result['mb_per_second'] = downloaded / 1e6 / result['seconds']
+            results[stream_name] = result
+    finally:
+        server.stop()
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark from the command line.
+
+    Keyword Arguments:
+        argv {Optional[List[str]]} -- Arguments (default: {None})
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Benchmark the tap against a mock Adyen report server.',
+    )
+    parser.add_argument(
+        '--streams',
+        nargs='+',
+        choices=list(REPORT_NAMES),
+        default=list(REPORT_NAMES),
+    )
+    parser.add_argument('--reports', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0,
+        help='Seconds to delay every response of the mock server',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--client',
+        action='append',
+        default=[],
+        metavar='KEY=VALUE',
+        help=(
+            'Keyword argument of the Adyen client, the value is JSON, e.g. '
+            '--client probe_strategy=\\"download\\" --client parse_workers=2'
+        ),
+    )
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the results to a JSON file',
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    client_options: dict = {}
+    for option in args.client:
+        key, _, value = option.partition('=')
+        client_options[key] = json.loads(value)
+
+    results: Dict[str, Dict[str, float]] = benchmark(
+        args.streams,
+        args.reports,
+        args.rows,
+        args.latency,
+        client_options,
+        args.seed,
+    )
+
+    _print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+def _print_table(results: Dict[str, Dict[str, float]]) -> None:
+    """Print the results as a table.
+
+    Arguments:
+        results {Dict[str, Dict[str, float]]} -- Measurements per stream
+    """
+    row = partial('{0:<28} {1:>10} {2:>10} {3:>8} {4:>14} {5:>12}'.format)
+    print(row(
+        'stream',
+        'rows/s',
+        'MB/s',
+        'probes',
+        'probe ms p95',
+        'peak RSS MB',
+    ))
+    for stream_name, result in results.items():
+        print(row(
+            stream_name,
+            f'{result["rows_per_second"]:.0f}',
+            f'{result["mb_per_second"]:.2f}',
+            result['probes'],
+            f'{result["probe_p95_ms"]:.1f}',
+            f'{result["peak_rss_mb"]:.1f}',
+        ))
+
+
+def _p95(latencies: List[float]) -> float:
+    """Return the 95th percentile of latencies.
+
+    Arguments:
+        latencies {List[float]} -- Latencies
+
+    Returns:
+        float -- 95th percentile
+    """
+    ordered: List[float] = sorted(latencies)
+    return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of this process.
+
+    On Linux, ru_maxrss survives the exec of a spawned process and would
+    include the peak of the parent with all generated reports, the peak of
+    the current memory map is read from /proc instead.
+
+    Returns:
+        float -- Megabytes
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass  # noqa: WPS420
+
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Bytes on macOS, kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / 1e6
+    return peak / 1e3
+
+
+if __name__ == '__main__':
+    main()
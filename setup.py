@@ -9,17 +9,26 @@ setup(
     author='Stitch',
     url='https://github.com/Yoast/singer-tap-adyen',
     classifiers=['Programming Language :: Python :: 3 :: Only'],
+    python_requires='>=3.8',
     py_modules=['tap_adyen'],
     install_requires=[
-        'httpx[http2]~=0.16.1',
+        'httpx[http2]~=0.18.2',
         'python-dateutil~=2.8.1',
         'singer-python~=5.10.0',
     ],
+    extras_require={
+        'parquet': [
+            'pyarrow',
+        ],
+        'test': [
+            'pytest',
+        ],
+    },
     entry_points="""
         [console_scripts]
         tap-adyen=tap_adyen:main
     """,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'tests']),
     package_data={
         'tap_adyen': [
             'schemas/*.json',
@@ -1,4 +1,24 @@
 """Initialize tap."""
 # -*- coding: utf-8 -*-
-# flake8: noqa
-from tap_adyen.tap import main  # noqa: F401
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    """Import the entry point when it is used.
+
+    Modules of the package, such as the cleaners that parse workers load,
+    are imported without the tap and its clients.
+
+    Arguments:
+        name {str} -- Attribute name
+
+    Raises:
+        AttributeError: Unknown attribute
+
+    Returns:
+        Any -- Attribute
+    """
+    if name == 'main':
+        from tap_adyen.tap import main  # noqa: WPS433
+        return main
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
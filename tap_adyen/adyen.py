@@ -2,13 +2,39 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from csv import DictReader
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from csv import DictReader, reader
 from datetime import datetime, timedelta
+from functools import partial
+from itertools import count, islice
 from types import MappingProxyType
-from typing import Callable, Generator, Optional
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import httpx
 import singer
+from httpx._decoders import TextDecoder  # noqa: WPS436
+
+from tap_adyen.cache import ReportCache
+from tap_adyen.connection import ConnectionSettings
+from tap_adyen.controller import RETRY_ERRORS, RequestController
+from tap_adyen.inventory import ReportInventory
+from tap_adyen.metrics import Metrics
+from tap_adyen.profiler import SyncProfiler
 
 API_SCHEME: str = 'https://'
 API_BASE_URL_LIVE: str = 'ca-live.adyen.com'
@@ -20,6 +46,11 @@ API_PATH_DISPUTE_REPORT: str = '/dispute_report_:date:.csv'
 API_PATH_PAYMENT_REPORT: str = '/payments_accounting_report_:date:.csv'
 API_PATH_SETTLEMENT_REPORT: str = '/settlement_detail_report_batch_:batch:.csv'
 
+# Yields offsets to probe, is sent whether they exist and returns the newest
+FrontierSearch = Generator[List[int], List[bool], Optional[int]]
+
+PROBE_STRATEGIES: tuple = ('linear', 'frontier', 'download')
+
 HEADERS: MappingProxyType = MappingProxyType({
     'User-Agent': (
         'Singer Tap: GitHub.com/Yoast/singer-tap-adyen/ | By Yoast.com'
@@ -37,6 +68,18 @@ class Adyen(object):  # noqa: WPS230
         user_password: str,
         merchant_account: str,
         test: bool,
+        probe_concurrency: int = 1,
+        probe_strategy: str = 'linear',
+        probe_lookahead: int = 0,
+        parse_workers: int = 1,
+        parse_chunk_rows: int = 10000,
+        report_cache: Optional[ReportCache] = None,
+        inventory: Optional[ReportInventory] = None,
+        controller: Optional[RequestController] = None,
+        connection: Optional[ConnectionSettings] = None,
+        download_window: int = 1,
+        profiler: Optional[SyncProfiler] = None,
+        metrics: Optional[Metrics] = None,
     ) -> None:
         """Initialize Adyen client.
 
@@ -46,15 +89,77 @@ class Adyen(object):  # noqa: WPS230
             user_password {str} -- Reporing user API key
             merchant_account {str} -- Adyen merchant account
             test {bool} -- Whether to use the test or live environmennt
+
+        Keyword Arguments:
+            probe_concurrency {int} -- Number of HEAD requests to keep in
+                flight while looking for reports (default: {1})
+            probe_strategy {str} -- How to look for reports: 'linear' walks
+                report by report, 'frontier' searches for the newest report
+                first, 'download' walks report by report using the download
+                of each report as its probe (default: {'linear'})
+            probe_lookahead {int} -- Number of missing reports in a row that
+                are tolerated before the search stops (default: {0})
+            parse_workers {int} -- Number of processes that clean the rows
+                of a report (default: {1})
+            parse_chunk_rows {int} -- Number of rows per chunk that is
+                cleaned in a process (default: {10000})
+            report_cache {Optional[ReportCache]} -- Cache of raw reports,
+                reports are downloaded again only when they changed
+                (default: {None})
+            inventory {Optional[ReportInventory]} -- Index of probed reports,
+                known reports are not probed again (default: {None})
+            controller {Optional[RequestController]} -- Limits, throttles
+                and retries the requests (default: {None})
+            connection {Optional[ConnectionSettings]} -- Connection pool and
+                timeouts of the web client (default: {None})
+            download_window {int} -- Number of downloads that are started
+                ahead with the 'download' probe strategy, multiplexed over
+                one connection with HTTP/2 (default: {1})
+            profiler {Optional[SyncProfiler]} -- Times the download, parse
+                and clean stages of every report (default: {None})
+            metrics {Optional[Metrics]} -- Counts the downloaded bytes, the
+                rows and the conversion errors (default: {None})
+
+        Raises:
+            ValueError: Unknown probe strategy
         """
         self.report_user: str = report_user
         self.company_account: str = company_account
         self.user_password: str = user_password
         self.merchant_account: str = merchant_account
         self.test: bool = test
+        self.probe_concurrency: int = probe_concurrency
+        self.probe_lookahead: int = probe_lookahead
+
+        if probe_strategy not in PROBE_STRATEGIES:
+            raise ValueError(f'Unknown probe strategy: {probe_strategy}')
+        self.probe_strategy: str = probe_strategy
+
+        # The process pool is started when it is first needed
+        self.parse_workers: int = parse_workers
+        self.parse_chunk_rows: int = parse_chunk_rows
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+
+        self.report_cache: Optional[ReportCache] = report_cache
+        self.inventory: Optional[ReportInventory] = inventory
+
+        # All requests go through the controller
+        self.controller: RequestController = (
+            controller or RequestController()
+        )
+
+        # Downloads started while looking for reports, by report URL
+        self.downloads: Dict[str, httpx._models.Response] = {}  # noqa: WPS437
+        self.download_window: int = max(download_window, 1)
+
+        self.profiler: Optional[SyncProfiler] = profiler
+        self.metrics: Optional[Metrics] = metrics
 
         # Setup reusable web client
-        self.client: httpx.Client = httpx.Client(http2=True)
+        self.connection: ConnectionSettings = (
+            connection or ConnectionSettings()
+        )
+        self.client: httpx.Client = self.connection.client()
 
         # Setup logger
         self.logger: logging.RootLogger = singer.get_logger()
@@ -62,7 +167,7 @@ class Adyen(object):  # noqa: WPS230
         # Check what URL to use (test/live)
         self.base_url = API_BASE_URL_TEST if test else API_BASE_URL_LIVE
 
-    def dispute_transaction_details(  # noqa: WPS210
+    def dispute_transaction_details(
         self,
         start_date: str,
     ) -> Generator[str, None, None]:
@@ -79,75 +184,14 @@ class Adyen(object):  # noqa: WPS230
             f'date: {start_date}',
         )
 
-        # Parse start_date string to date
-        parsed_date: datetime = datetime.strptime(start_date, '%Y-%m-%d')
-
-        # Replace placeholder in reports path
-        merchant: str = API_PATH_REPORTS_MERCHANT.replace(
-            ':merchant:',
-            self.merchant_account,
+        yield from self._probe_reports(
+            self._date_locator(API_PATH_DISPUTE_REPORT, start_date),
+            'dispute transaction details report date',
         )
 
-        # Loop through increasing dates
-        while True:
-            # Fill in placeholder
-            date: str = parsed_date.strftime('%Y_%m_%d')
-            report: str = API_PATH_DISPUTE_REPORT.replace(
-                ':date:',
-                str(date),
-            )
-
-            # Create the URL
-            url: str = (
-                f'{API_SCHEME}{self.base_url}'
-                f'{API_PATH_REPORTS}'
-                f'{merchant}'
-                f'{report}'
-            )
-
-            # Perform a HEAD request on the report url
-            try:
-                response: httpx._models.Response = (  # noqa: WPS437
-                    self._head_request(url)
-                )
-            except:
-                self.logger.info(
-                    'Died when looking for settlement details reports. Batch: '
-                    f'{date}',
-                )
-                break
-
-            # The report with the batch number exists
-            if response.status_code == 200:  # noqa: WPS432
-                self.logger.info(
-                    f'Found dispute transaction details report date: {date}',
-                )
-
-                # Yield the URL
-                yield url
-
-                # Increate the day by 1 day
-                parsed_date = parsed_date + timedelta(days=1)
-
-            # No report found, stop the loop
-            elif response.status_code == 404:  # noqa: WPS432
-                self.logger.debug(
-                    f'Dispute transaction details report date: {date} not '
-                    'found, stopping.',
-                )
-                break
-
-            # Unexpected HTTP response
-            else:
-                self.logger.critical(
-                    f'Unexpected HTTP status code while checking: {url}. ',
-                    f'({response.status_code})',
-                )
-                response.raise_for_status()
-
         self.logger.info('Finished: Dispute Transaction Reports')
 
-    def payment_accounting(  # noqa: WPS210
+    def payment_accounting(
         self,
         start_date: str,
     ) -> Generator[str, None, None]:
@@ -164,199 +208,957 @@ class Adyen(object):  # noqa: WPS230
             f'{start_date}',
         )
 
-        # Parse start_date string to date
-        parsed_date: datetime = datetime.strptime(start_date, '%Y-%m-%d')
+        yield from self._probe_reports(
+            self._date_locator(API_PATH_PAYMENT_REPORT, start_date),
+            'payment accounting report date',
+        )
 
-        # Replace placeholder in reports path
-        merchant: str = API_PATH_REPORTS_MERCHANT.replace(
-            ':merchant:',
-            self.merchant_account,
+        self.logger.info('Finished: Payment Accounting Reports')
+
+    def settlement_details(
+        self,
+        batch_number: int,
+    ) -> Generator[str, None, None]:
+        """Get the settlement details report URLs.
+
+        Arguments:
+            batch_number {int} -- Batch number to start generating urls from
+
+        Yields:
+            Generator[str, None, None] -- Urls of settlement detail reports
+        """
+        self.logger.info(
+            'Looking for settlement details reports. Starting with batch: '
+            f'{batch_number}',
         )
 
-        # Loop through increasing dates
-        while True:
-            # Fill in placeholder
-            date: str = parsed_date.strftime('%Y_%m_%d')
-            report: str = API_PATH_PAYMENT_REPORT.replace(
-                ':date:',
-                str(date),
-            )
+        yield from self._probe_reports(
+            self._batch_locator(API_PATH_SETTLEMENT_REPORT, batch_number),
+            'settlement details report batch',
+        )
+
+        self.logger.info('Finished retrieving Settlement Details Reports')
 
-            # Create the URL
-            url: str = (
-                f'{API_SCHEME}{self.base_url}'
-                f'{API_PATH_REPORTS}'
-                f'{merchant}'
-                f'{report}'
+    def warm_up(self) -> None:
+        """Set up the connection to Adyen before the first report.
+
+        The TLS handshake and HTTP/2 setup happen once, the connection is
+        reused by all later requests. Errors are only logged, the requests
+        of the sync will report them.
+        """
+        try:
+            response: httpx._models.Response = (  # noqa: WPS437
+                self.client.head(
+                    self._report_url(''),
+                    auth=(self.report_user, self.user_password),
+                    headers=dict(HEADERS),
+                )
             )
+        except httpx.HTTPError as error:
+            self.logger.warning(f'Could not connect to Adyen: {error}')
+            return
 
-            # Perform a HEAD request on the report url
-            try:
-                response: httpx._models.Response = (  # noqa: WPS437
-                    self._head_request(url)
+        self.logger.info(
+            f'Connected to {self.base_url} using {response.http_version}',
+        )
+
+    def retrieve_csv(  # noqa: WPS231
+        self,
+        csv_url: str,
+        cleaner: Optional[Callable],
+        compiler: Optional[Callable] = None,
+        skip_rows: int = 0,
+    ) -> Generator[dict, None, None]:
+        """Download the csv.
+
+        Arguments:
+            csv_url {str} -- The URL that points to the correct CSV file
+            cleaner {Optional[Callable]} -- Optional cleaner function
+
+        Keyword Arguments:
+            compiler {Optional[Callable]} -- Optional cleaner compiler, used
+                instead of the cleaner (default: {None})
+            skip_rows {int} -- Number of rows at the start of the csv that
+                are skipped without cleaning them, the row numbers of the
+                other rows do not change (default: {0})
+
+        Yields:
+            Generator[dict] -- Yields Adyen csvs
+        """
+        self.logger.info(f'Downloading report: {csv_url}')
+
+        # Stream the csv, so that it never has to fit in memory
+        response: httpx._models.Response = (  # noqa: WPS437
+            self._open_download(csv_url)
+        )
+        try:
+
+            # The frontier search hands out URLs of missing reports within
+            # the range, these are skipped
+            frontier: bool = self.probe_strategy == 'frontier'
+            if response.status_code == 404 and frontier:  # noqa: WPS432
+                self.logger.info(f'Report not found, skipping: {csv_url}')
+                return
+
+            # If the status is not 200 or 304 raise the status
+            if response.status_code not in {200, 304}:  # noqa: WPS432
+                self.logger.critical(
+                    'Unexpected HTTP status code while downloading: '
+                    f'{csv_url}. ({response.status_code})',
                 )
-            except:
-                self.logger.info(
-                    'Died when looking for settlement details reports. Date: '
-                    f'{date}',
+                response.raise_for_status()
+
+            chunks: Iterator[str] = self._report_text(response, csv_url)
+            if self.profiler:
+                chunks = self.profiler.iterate(chunks, 'download', csv_url)
+
+            # Clean chunks of rows in a process pool
+            if (cleaner or compiler) and self.parse_workers > 1:
+                cleaned: Iterator[dict] = self._clean_parallel(
+                    iter_lines(chunks),
+                    cleaner,
+                    csv_url,
+                    compiler,
+                    skip_rows,
                 )
-                break
 
-            # The report with the batch number exists
-            if response.status_code == 200:  # noqa: WPS432
-                self.logger.info(
-                    f'Found payment accounting report date: {date}',
+                # Parsing and cleaning both happen in the pool
+                if self.profiler:
+                    cleaned = self.profiler.iterate(cleaned, 'clean', csv_url)
+                yield from cleaned
+                return
+
+            # Compile a cleaner for the header of the csv
+            if compiler:
+                rows: Iterator[List[str]] = reader(
+                    iter_lines(chunks),
+                    delimiter=',',
                 )
+                if self.profiler:
+                    rows = self.profiler.iterate(rows, 'parse', csv_url)
+                header: Optional[List[str]] = next(rows, None)
+                if header is None:
+                    return
+                clean: Callable = compiler(header, csv_url)
+                if self.profiler:
+                    clean = self.profiler.wrap(clean, 'clean', csv_url)
 
-                # Yield the URL
-                yield url
+                # Empty rows are skipped, like in a DictReader
+                yield from (
+                    clean(row, row_number)
+                    for row_number, row in enumerate(
+                        islice(filter(None, rows), skip_rows, None),
+                        skip_rows,
+                    )
+                )
+                return
 
-                # Increate the day by 1 day
-                parsed_date = parsed_date + timedelta(days=1)
+            # Read the csv while it is being downloaded
+            csv: Iterator[dict] = DictReader(
+                iter_lines(chunks),
+                delimiter=',',
+            )
+            if self.profiler:
+                csv = self.profiler.iterate(csv, 'parse', csv_url)
+                if cleaner:
+                    cleaner = self.profiler.wrap(cleaner, 'clean', csv_url)
 
-            # No report found, stop the loop
-            elif response.status_code == 404:  # noqa: WPS432
-                self.logger.debug(
-                    f'Payment accounting report date: {date} not '
-                    'found, stopping.',
+            # Clean every row in the csv
+            if cleaner:
+                yield from (
+                    cleaner(row, row_number, csv_url)
+                    for row_number, row in enumerate(
+                        islice(csv, skip_rows, None),
+                        skip_rows,
+                    )
                 )
-                break
 
-            # Unexpected HTTP response
+            # Return every row in the csv
             else:
-                self.logger.critical(
-                    f'Unexpected HTTP status code while checking: {url}. ',
-                    f'({response.status_code})',
-                )
-                response.raise_for_status()
+                yield from islice(csv, skip_rows, None)
+        finally:
+            response.close()
 
-        self.logger.info('Finished: Payment Accounting Reports')
+    def _open_download(
+        self,
+        csv_url: str,
+    ) -> httpx._models.Response:  # noqa: WPS437
+        """Start the streamed download of a report.
 
-    def settlement_details(
+        Arguments:
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Returns:
+            httpx._models.Response -- Streamed GET response, must be closed
+        """
+        # The download may have been started while looking for the report
+        started: Optional[httpx._models.Response] = (  # noqa: WPS437
+            self.downloads.pop(csv_url, None)
+        )
+        if started is not None:
+            return started
+
+        return self.controller.send(partial(
+            self.client.send,
+            self.client.build_request(
+                'GET',
+                csv_url,
+                headers=self._download_headers(csv_url),
+            ),
+            stream=True,
+            auth=(self.report_user, self.user_password),
+        ))
+
+    def _download_headers(self, csv_url: str) -> dict:
+        """Create the headers of a report download.
+
+        Arguments:
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Returns:
+            dict -- Request headers, conditional when the report is cached
+        """
+        if self.report_cache is None:
+            return dict(HEADERS)
+        return {**HEADERS, **self.report_cache.headers(csv_url)}
+
+    def _report_text(
         self,
-        batch_number: int,
+        response: httpx._models.Response,  # noqa: WPS437
+        csv_url: str,
+    ) -> Iterator[str]:
+        """Return the text of a downloaded report.
+
+        Arguments:
+            response {httpx._models.Response} -- Streamed GET response
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Returns:
+            Iterator[str] -- Text chunks of the report
+        """
+        if self.report_cache is None:
+            return self._iter_text(response, csv_url)
+
+        # The report did not change, read it from the cache
+        if response.status_code == 304:  # noqa: WPS432
+            self.logger.info(f'Report not modified, using cache: {csv_url}')
+            return self.report_cache.read(csv_url)
+
+        # Store the report while it is being downloaded
+        return self.report_cache.tee(
+            csv_url,
+            response.headers,
+            self._iter_text(response, csv_url),
+        )
+
+    def _iter_text(  # noqa: WPS231
+        self,
+        response: httpx._models.Response,  # noqa: WPS437
+        csv_url: str,
     ) -> Generator[str, None, None]:
-        """Get the settlement details report URLs.
+        """Decode a report while it downloads, resuming broken downloads.
+
+        When the connection breaks, the download continues with a Range
+        request from the last received byte. The If-Range header makes sure
+        that the rest belongs to the same version of the report. The bytes
+        are fed to the same decoder, so the csv reader continues where it
+        was and no row is read twice. Reports that are sent compressed can
+        not be resumed.
 
         Arguments:
-            batch_number {int} -- Batch number to start generating urls from
+            response {httpx._models.Response} -- Streamed GET response
+            csv_url {str} -- The URL that points to the correct CSV file
 
         Yields:
-            Generator[str, None, None] -- Urls of settlement detail reports
+            Generator[str, None, None] -- Text chunks of the report
         """
-        self.logger.info(
-            'Looking for settlement details reports. Starting with batch: '
-            f'{batch_number}',
+        decoder: TextDecoder = TextDecoder(encoding=response.encoding)
+        received: int = 0
+        resumes: int = 0
+        validator: Optional[str] = range_validator(response)
+        max_resumes: int = self.controller.max_retries if validator else 0
+
+        try:
+            while True:  # noqa: WPS457
+                try:
+                    for chunk in response.iter_bytes():
+                        received += len(chunk)
+                        text: str = decoder.decode(chunk)
+                        if text:
+                            yield text
+                    break
+                except RETRY_ERRORS as error:
+                    resumes += 1
+                    if resumes > max_resumes:
+                        raise
+
+                    self.logger.warning(
+                        f'Download broke after {received} bytes ({error!r}), '
+                        f'resuming: {csv_url}',
+                    )
+                    response.close()
+                    response = self.controller.send(partial(
+                        self.client.send,
+                        self.client.build_request(
+                            'GET',
+                            csv_url,
+                            headers={
+                                **HEADERS,
+                                'Range': f'bytes={received}-',
+                                'If-Range': validator,  # type: ignore
+                            },
+                        ),
+                        stream=True,
+                        auth=(self.report_user, self.user_password),
+                    ))
+
+                    # Only the rest of the same report can be used
+                    if not is_continuation(response, received):
+                        raise
+        finally:
+            response.close()
+            if self.metrics:
+                self.metrics.inc('tap_adyen_downloaded_bytes_total', received)
+
+        tail: str = decoder.flush()
+        if tail:
+            yield tail
+
+    def _clean_parallel(  # noqa: WPS210
+        self,
+        lines: Iterable[str],
+        cleaner: Optional[Callable],
+        csv_url: str,
+        compiler: Optional[Callable],
+        skip_rows: int = 0,
+    ) -> Generator[dict, None, None]:
+        """Clean the rows of a csv in a process pool.
+
+        The csv is split into chunks of complete records. Every chunk knows
+        the row number of its first row, so the ids created by the cleaner
+        are the same as when cleaning sequentially. The chunks are cleaned
+        in order of the csv and a limited number of chunks is in flight.
+
+        Arguments:
+            lines {Iterable[str]} -- Lines of the csv
+            cleaner {Optional[Callable]} -- Cleaner function
+            csv_url {str} -- The URL that points to the correct CSV file
+            compiler {Optional[Callable]} -- Cleaner compiler, used instead
+                of the cleaner
+
+        Keyword Arguments:
+            skip_rows {int} -- Number of rows at the start of the csv that
+                are skipped without cleaning them (default: {0})
+
+        Yields:
+            Generator[dict, None, None] -- Cleaned rows
+        """
+        # Start the process pool once per client
+        if self.parse_pool is None:
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+            )
+
+        records: Iterator[str] = iter_records(lines)
+        header: Optional[str] = next(records, None)
+        if header is None:
+            return
+
+        chunks: Iterator[Tuple[int, List[str]]] = iter_chunks(
+            skip_records(records, skip_rows),
+            self.parse_chunk_rows,
+            skip_rows,
         )
 
+        in_flight: Deque[Future] = deque()
+        try:
+            for first_row, chunk in chunks:
+                in_flight.append(self.parse_pool.submit(
+                    clean_chunk,
+                    cleaner,
+                    header,
+                    chunk,
+                    first_row,
+                    csv_url,
+                    compiler,
+                ))
+
+                # Yield the oldest chunk when enough chunks are in flight
+                if len(in_flight) > self.parse_workers * 2:
+                    yield from in_flight.popleft().result()
+
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for pending in in_flight:
+                pending.cancel()
+
+    def _report_url(self, report: str) -> str:
+        """Create the full URL of a merchant report.
+
+        Arguments:
+            report {str} -- Report path, with its placeholders filled in
+
+        Returns:
+            str -- Report URL
+        """
         # Replace placeholder in reports path
         merchant: str = API_PATH_REPORTS_MERCHANT.replace(
             ':merchant:',
             self.merchant_account,
         )
 
-        # Loop through increasing batch numbers
-        while True:
+        return (
+            f'{API_SCHEME}{self.base_url}'
+            f'{API_PATH_REPORTS}'
+            f'{merchant}'
+            f'{report}'
+        )
+
+    def _date_locator(
+        self,
+        report: str,
+        start_date: str,
+    ) -> Callable[[int], Tuple[str, str]]:
+        """Create a locator for daily reports.
+
+        Arguments:
+            report {str} -- Report path with a :date: placeholder
+            start_date {str} -- Date of the first report
+
+        Returns:
+            Callable[[int], Tuple[str, str]] -- Maps a day offset from the
+                start date to the report date and the report URL
+        """
+        # Parse start_date string to date
+        parsed_date: datetime = datetime.strptime(start_date, '%Y-%m-%d')
+
+        def locate(offset: int) -> Tuple[str, str]:  # noqa: WPS430
+            # Fill in placeholder
+            date: str = (
+                parsed_date + timedelta(days=offset)
+            ).strftime('%Y_%m_%d')
+            return date, self._report_url(report.replace(':date:', date))
+
+        return locate
+
+    def _batch_locator(
+        self,
+        report: str,
+        batch_number: int,
+    ) -> Callable[[int], Tuple[str, str]]:
+        """Create a locator for batch reports.
+
+        Arguments:
+            report {str} -- Report path with a :batch: placeholder
+            batch_number {int} -- Batch number of the first report
+
+        Returns:
+            Callable[[int], Tuple[str, str]] -- Maps an offset from the first
+                batch number to the batch number and the report URL
+        """
+
+        def locate(offset: int) -> Tuple[str, str]:  # noqa: WPS430
             # Fill in placeholder
-            report: str = API_PATH_SETTLEMENT_REPORT.replace(
-                ':batch:',
-                str(batch_number),
+            batch: str = str(int(batch_number) + offset)
+            return batch, self._report_url(report.replace(':batch:', batch))
+
+        return locate
+
+    def _probe_reports(
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+    ) -> Generator[str, None, None]:
+        """Yield report URLs in order until the last existing report.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+
+        Yields:
+            Generator[str, None, None] -- Urls of existing reports
+        """
+        # Search the newest report first, then hand out all URLs up to it
+        if self.probe_strategy == 'frontier':
+            yield from self._probe_frontier(locate, description)
+            return
+
+        walk: Callable = self._probe_sequential
+        if self.probe_strategy == 'download':
+            walk = self._probe_downloads
+        elif self.probe_concurrency > 1:
+            walk = self._probe_window
+
+        offset: Optional[int] = 0
+        while offset is not None:
+            # Walk until the first missing report
+            missing: Optional[int] = yield from walk(
+                locate,
+                description,
+                offset,
             )
 
-            # Create the URL
-            url: str = (
-                f'{API_SCHEME}{self.base_url}'
-                f'{API_PATH_REPORTS}'
-                f'{merchant}'
-                f'{report}'
+            # Look past the missing report for the next existing one
+            offset = None if missing is None else self._skip_gap(
+                locate,
+                description,
+                missing,
             )
 
-            # Perform a HEAD request on the report url
+    def _probe_sequential(
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+        start: int,
+    ) -> Generator[str, None, Optional[int]]:
+        """Yield report URLs one HEAD request at a time.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+            start {int} -- Offset of the first report to probe
+
+        Yields:
+            Generator[str, None, Optional[int]] -- Urls of existing reports
+
+        Returns:
+            Optional[int] -- Offset of the first missing report
+        """
+        # Loop through increasing dates or batch numbers
+        for offset in count(start):
+            key, url = locate(offset)
+
+            # Check whether the report exists
             try:
-                response: httpx._models.Response = (  # noqa: WPS437
-                    self._head_request(url)
-                )
-            except:
-                self.logger.info(
-                    'Died when looking for settlement details reports. Batch: '
-                    f'{batch_number}',
+                exists: bool = self._check(url)
+            except httpx.RequestError:
+                self.logger.critical(
+                    f'Died when looking for {description}: {key}',
                 )
-                break
+                raise
 
-            # The report with the batch number exists
-            if response.status_code == 200:  # noqa: WPS432
-                self.logger.info(
-                    f'Found settlement details report batch: {batch_number}',
-                )
+            # No report found, stop the loop
+            if not self._report_exists(exists, description, key):
+                return offset
 
-                # Yield the URL
-                yield url
+            # Yield the URL
+            yield url
 
-                # Increase batch number
-                batch_number += 1
+        return None
 
-            # No report found, stop the loop
-            elif response.status_code == 404:  # noqa: WPS432
-                self.logger.debug(
-                    f'Settlement details report batch: {batch_number} not '
-                    'found, stopping.',
-                )
-                break
+    def _probe_downloads(  # noqa: WPS210, WPS231
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+        start: int,
+    ) -> Generator[str, None, Optional[int]]:
+        """Yield report URLs, using the download of each report as probe.
 
-            # Unexpected HTTP response
-            else:
-                self.logger.critical(
-                    f'Unexpected HTTP status code while checking: {url}. ',
-                    f'({response.status_code})',
-                )
-                response.raise_for_status()
+        Instead of a HEAD request, the download of the report is started.
+        When the report exists, the open response is handed to retrieve_csv
+        for the same URL, so every report takes a single request. The
+        downloads of the next download_window reports are started ahead,
+        with HTTP/2 they share one connection. The answers are handled in
+        order and the walk stops at the first report that is not found.
 
-        self.logger.info('Finished retrieving Settlement Details Reports')
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+            start {int} -- Offset of the first report to probe
+
+        Yields:
+            Generator[str, None, Optional[int]] -- Urls of existing reports
+
+        Returns:
+            Optional[int] -- Offset of the first missing report
+        """
+        offsets: Iterator[int] = count(start)
+        window: Deque[Tuple[str, str, int, Future]] = deque()
+        started: List[str] = []
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.download_window,
+            ) as executor:
+
+                def submit() -> None:  # noqa: WPS430
+                    offset: int = next(offsets)
+                    key, url = locate(offset)
+                    future: Future = executor.submit(self._start_download, url)
+                    window.append((key, url, offset, future))
+
+                # Fill the window
+                for _ in range(self.download_window):
+                    submit()
+
+                try:
+                    while window:
+                        key, url, offset, future = window.popleft()
+
+                        # Wait for the oldest download in the window
+                        try:
+                            exists: bool = future.result()
+                        except httpx.RequestError:
+                            self.logger.critical(
+                                f'Died when looking for {description}: {key}',
+                            )
+                            raise
+
+                        # No report found, stop the loop
+                        if not self._report_exists(exists, description, key):
+                            return offset
+
+                        # Slide the window before handing out the URL
+                        submit()
+
+                        # Yield the URL, retrieve_csv continues the download
+                        started.append(url)
+                        yield url
+                finally:
+                    # Drop the downloads that have not been started yet
+                    for _, _, _, pending in window:
+                        pending.cancel()
+        except BaseException:
+            # Close the downloads that were not continued
+            for started_url in started:
+                if started_url in self.downloads:
+                    self.downloads.pop(started_url).close()
+            raise
+        finally:
+            # Close the downloads that were started ahead
+            for _, ahead_url, _, _ in window:
+                if ahead_url in self.downloads:
+                    self.downloads.pop(ahead_url).close()
+
+        return None
+
+    def _start_download(self, url: str) -> bool:
+        """Start the download of a report, if it exists.
 
-    def retrieve_csv(
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            bool -- Whether the report exists, the open response is kept in
+                downloads if it does
+        """
+        # Reports that were recently found missing are not requested again
+        if self.inventory and self.inventory.exists(url) is False:
+            return False
+
+        response: httpx._models.Response = (  # noqa: WPS437
+            self._open_download(url)
+        )
+
+        # A cached report that did not change
+        exists: bool = response.status_code == 304  # noqa: WPS432
+        try:
+            exists = exists or self._exists(response)
+        except BaseException:
+            response.close()
+            raise
+
+        if self.inventory:
+            self._record(url, exists, response)
+
+        if not exists:
+            response.close()
+            return False
+
+        self.downloads[url] = response
+        return True
+
+    def _probe_window(  # noqa: WPS210
         self,
-        csv_url: str,
-        cleaner: Optional[Callable],
-    ) -> Generator[dict, None, None]:
-        """Download the csv.
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+        start: int,
+    ) -> Generator[str, None, Optional[int]]:
+        """Yield report URLs using a sliding window of HEAD requests.
+
+        The next probe_concurrency reports are probed at the same time. The
+        answers are still handled in order, so URLs are yielded in the same
+        order as the sequential probing and the walk stops at the first
+        report that is not found.
 
         Arguments:
-            csv_url {str} -- The URL that points to the correct CSV file
-            cleaner {Optional[Callable]} -- Optional cleaner function
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+            start {int} -- Offset of the first report to probe
 
         Yields:
-            Generator[dict] -- Yields Adyen csvs
+            Generator[str, None, Optional[int]] -- Urls of existing reports
+
+        Returns:
+            Optional[int] -- Offset of the first missing report
         """
-        self.logger.info(f'Downloading report: {csv_url}')
+        offsets: Iterator[int] = count(start)
+        window: Deque[Tuple[str, str, int, Future]] = deque()
 
-        # Get Request to get the csv in binary format
-        response: httpx._models.Response = self.client.get(  # noqa: WPS437
-            csv_url,
-            auth=(self.report_user, self.user_password),
-            headers=dict(HEADERS),
+        with ThreadPoolExecutor(
+            max_workers=self.probe_concurrency,
+        ) as executor:
+
+            def submit() -> None:  # noqa: WPS430
+                offset: int = next(offsets)
+                key, url = locate(offset)
+                future: Future = executor.submit(self._check, url)
+                window.append((key, url, offset, future))
+
+            # Fill the window
+            for _ in range(self.probe_concurrency):
+                submit()
+
+            try:
+                while window:
+                    key, url, offset, future = window.popleft()
+
+                    # Wait for the oldest check in the window
+                    try:
+                        exists: bool = future.result()
+                    except httpx.RequestError:
+                        self.logger.critical(
+                            f'Died when looking for {description}: {key}',
+                        )
+                        raise
+
+                    # No report found, stop the loop
+                    if not self._report_exists(exists, description, key):
+                        return offset
+
+                    # Slide the window before handing out the URL
+                    submit()
+
+                    # Yield the URL
+                    yield url
+            finally:
+                # Drop the probes that have not been sent yet
+                for _, _, _, pending in window:
+                    pending.cancel()
+
+        return None
+
+    def _skip_gap(
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+        missing: int,
+    ) -> Optional[int]:
+        """Look past a missing report for the next existing report.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+            missing {int} -- Offset of the missing report
+
+        Returns:
+            Optional[int] -- Offset of the next existing report, if any
+        """
+        if not self.probe_lookahead:
+            return None
+
+        offsets: List[int] = list(
+            range(missing + 1, missing + self.probe_lookahead + 1),
         )
 
-        # If the status is not 200 raise the status
-        if response.status_code != 200:  # noqa: WPS432
+        try:
+            found: List[bool] = self._probe_many(
+                [locate(offset)[1] for offset in offsets],
+            )
+        except httpx.RequestError:
             self.logger.critical(
-                f'Unexpected HTTP status code while downloading: {csv_url}. '
-                f'({response.status_code})',
+                f'Died when looking past {description}: '
+                f'{locate(missing)[0]}',
             )
-            response.raise_for_status()
+            raise
+
+        for offset, exists in zip(offsets, found):
+            if exists:
+                self.logger.info(
+                    f'Skipping missing {description}: {locate(missing)[0]} '
+                    f'up to {locate(offset)[0]}',
+                )
+                return offset
+
+        return None
+
+    def _probe_frontier(  # noqa: WPS210, WPS231
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+    ) -> Generator[str, None, None]:
+        """Yield report URLs up to the newest report.
+
+        The newest report is bracketed by probing exponentially growing
+        offsets and then pinned down with a binary search, which takes a
+        logarithmic number of HEAD requests. An offset counts as existing
+        when the report or one of the probe_lookahead reports after it
+        exists, so gaps do not end the search. Reports that are missing
+        within the range are skipped while downloading. Only a report that
+        is not found counts as missing, other statuses raise.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
 
-        # Read the csv
-        csv: DictReader = DictReader(response.text.splitlines(), delimiter=',')
+        Yields:
+            Generator[str, None, None] -- Urls of reports up to the newest
+        """
+        search: FrontierSearch = frontier_search(self.probe_lookahead)
+        requests: int = 0
 
-        # Clean every row in the csv
-        if cleaner:
-            yield from (
-                cleaner(row, row_number, csv_url)
-                for row_number, row in enumerate(csv)
+        # Probe the offsets the search asks for, until it returns the newest
+        try:
+            offsets: List[int] = next(search)
+            while True:
+                requests += len(offsets)
+                offsets = search.send(self._probe_many(
+                    [locate(offset)[1] for offset in offsets],
+                ))
+        except StopIteration as search_result:
+            newest: Optional[int] = search_result.value
+        except httpx.RequestError:
+            self.logger.critical(
+                f'Died when searching for the newest {description}',
             )
+            raise
 
-        # Return every row in the csv
-        else:
-            yield from (row for row in csv)
+        # No reports at all
+        if newest is None:
+            self.logger.debug(
+                f'{description.capitalize()}: {locate(0)[0]} not found, '
+                'stopping.',
+            )
+            return
+
+        self.logger.info(
+            f'Found newest {description}: {locate(newest)[0]} '
+            f'({requests} HEAD requests)',
+        )
+
+        for offset in range(newest + 1):
+            yield locate(offset)[1]
+
+    def _probe_many(self, urls: List[str]) -> List[bool]:
+        """Check whether reports exist.
+
+        Arguments:
+            urls {List[str]} -- Report URLs
+
+        Returns:
+            List[bool] -- Whether each report exists
+        """
+        if self.probe_concurrency > 1 and len(urls) > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.probe_concurrency,
+            ) as executor:
+                return list(executor.map(self._check, urls))
+
+        return [self._check(url) for url in urls]
+
+    def _check(self, url: str) -> bool:
+        """Check whether a report exists, using the inventory if possible.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            bool -- Whether the report exists
+        """
+        if self.inventory is None:
+            return self._exists(self._head_request(url))
+
+        # Known reports are not probed again
+        known: Optional[bool] = self.inventory.exists(url)
+        if known is not None:
+            return known
+
+        response: httpx._models.Response = (  # noqa: WPS437
+            self._head_request(url)
+        )
+        exists: bool = self._exists(response)
+        self._record(url, exists, response)
+        return exists
+
+    def _record(
+        self,
+        url: str,
+        exists: bool,
+        response: httpx._models.Response,  # noqa: WPS437
+    ) -> None:
+        """Record the result of a probe in the inventory.
+
+        Arguments:
+            url {str} -- Report URL
+            exists {bool} -- Whether the report exists
+            response {httpx._models.Response} -- Response of the probe
+        """
+        # The size is only known when the report was sent
+        size: Optional[str] = response.headers.get('content-length')
+        sent: bool = response.status_code == 200  # noqa: WPS432
+        self.inventory.record(  # type: ignore
+            url,
+            self.merchant_account,
+            exists,
+            size=int(size) if sent and size else None,
+            etag=response.headers.get('etag'),
+        )
+
+    def _report_exists(
+        self,
+        exists: bool,
+        description: str,
+        key: str,
+    ) -> bool:
+        """Log whether a report exists.
+
+        Arguments:
+            exists {bool} -- Whether the report exists
+            description {str} -- Report description, used for logging
+            key {str} -- Report date or batch number, used for logging
+
+        Returns:
+            bool -- Whether the report exists
+        """
+        # The report exists
+        if exists:
+            self.logger.info(f'Found {description}: {key}')
+            return True
+
+        # No report found
+        self.logger.debug(
+            f'{description.capitalize()}: {key} not found, stopping.',
+        )
+        return False
+
+    def _exists(
+        self,
+        response: httpx._models.Response,  # noqa: WPS437
+    ) -> bool:
+        """Check the HEAD response of a report.
+
+        Arguments:
+            response {httpx._models.Response} -- Response of HEAD request
+
+        Returns:
+            bool -- Whether the report exists
+        """
+        # The report exists
+        if response.status_code == 200:  # noqa: WPS432
+            return True
+
+        # No report found
+        elif response.status_code == 404:  # noqa: WPS432
+            return False
+
+        # Unexpected HTTP response
+        self.logger.critical(
+            f'Unexpected HTTP status code while checking: {response.url}. '
+            f'({response.status_code})',
+        )
+        response.raise_for_status()
+        return False
 
     def _head_request(
         self,
@@ -370,8 +1172,276 @@ class Adyen(object):  # noqa: WPS230
         Returns:
             httpx._models.Response -- Response of HEAD request
         """
-        return self.client.head(
+        return self.controller.send(partial(
+            self.client.head,
             url,
             auth=(self.report_user, self.user_password),
             headers=dict(HEADERS),
-        )
+        ))
+
+
+def frontier_search(lookahead: int) -> FrontierSearch:  # noqa: WPS231
+    """Search the offset of the newest report.
+
+    The search yields lists of offsets that should be probed and expects to
+    be sent whether the reports at those offsets exist. An offset counts as
+    existing when the report or one of the lookahead reports after it
+    exists. The newest report is bracketed by probing exponentially growing
+    offsets and then pinned down with a binary search.
+
+    Arguments:
+        lookahead {int} -- Number of missing reports in a row to tolerate
+
+    Yields:
+        FrontierSearch -- Offsets to probe
+
+    Returns:
+        Optional[int] -- Offset of the newest report, if any report exists
+    """
+    probed: Dict[int, bool] = {}
+
+    def exists_near(  # noqa: WPS430
+        offset: int,
+    ) -> Generator[List[int], List[bool], bool]:
+        near: range = range(offset, offset + lookahead + 1)
+        offsets: List[int] = [
+            near_offset for near_offset in near if near_offset not in probed
+        ]
+        if offsets:
+            probed.update(zip(offsets, (yield offsets)))
+        return any(probed[near_offset] for near_offset in near)
+
+    # No reports at all
+    if not (yield from exists_near(0)):
+        return None
+
+    # Gallop to bracket the newest report
+    low: int = 0
+    high: int = 1
+    while (yield from exists_near(high)):
+        low, high = high, high + (high - low) * 2
+
+    # Binary search between the last hit and the first miss
+    while high - low > 1:
+        middle: int = (low + high) // 2
+        if (yield from exists_near(middle)):
+            low = middle
+        else:
+            high = middle
+
+    # The newest report is within the lookahead of the last hit
+    return max(
+        offset
+        for offset in range(low, low + lookahead + 1)
+        if probed[offset]
+    )
+
+
+def range_validator(
+    response: httpx._models.Response,  # noqa: WPS437
+) -> Optional[str]:
+    """Return the validator for resuming a download with a Range request.
+
+    Arguments:
+        response {httpx._models.Response} -- Response of the download
+
+    Returns:
+        Optional[str] -- ETag or Last-Modified header, None if the download
+            can not be resumed
+    """
+    # Byte ranges of compressed responses do not match the received bytes
+    if response.headers.get('content-encoding', 'identity') != 'identity':
+        return None
+
+    return response.headers.get('etag') or response.headers.get(
+        'last-modified',
+    )
+
+
+def is_continuation(
+    response: httpx._models.Response,  # noqa: WPS437
+    received: int,
+) -> bool:
+    """Check whether a response continues a download.
+
+    Arguments:
+        response {httpx._models.Response} -- Response of the Range request
+        received {int} -- Number of bytes that were received
+
+    Returns:
+        bool -- Whether the response contains the rest of the download
+    """
+    # Partial content
+    if response.status_code != 206:  # noqa: WPS432
+        return False
+
+    content_range: str = response.headers.get('content-range', '')
+    return content_range.startswith(f'bytes {received}-')
+
+
+def iter_lines(chunks: Iterable[str]) -> Generator[str, None, None]:
+    """Split decoded text chunks into lines.
+
+    The lines keep their line endings, so that the csv reader can handle
+    quoted values that span multiple lines.
+
+    Arguments:
+        chunks {Iterable[str]} -- Decoded text chunks
+
+    Yields:
+        Generator[str, None, None] -- Lines
+    """
+    pending: str = ''
+
+    for chunk in chunks:
+        lines: List[str] = (pending + chunk).splitlines(keepends=True)
+
+        # The last line may continue in the next chunk, even when it ends
+        # with a carriage return that is followed by a newline
+        pending = lines.pop() if lines else ''
+
+        yield from lines
+
+    if pending:
+        yield pending
+
+
+def iter_records(lines: Iterable[str]) -> Generator[str, None, None]:
+    """Group csv lines into complete records.
+
+    A record ends at a line ending outside of a quoted value. The records
+    keep their line endings.
+
+    Arguments:
+        lines {Iterable[str]} -- Lines of the csv, with line endings
+
+    Yields:
+        Generator[str, None, None] -- Records
+    """
+    record: List[str] = []
+    quoted: bool = False
+
+    for line in lines:
+        record.append(line)
+
+        # An odd number of quotes opens or closes a quoted value
+        if line.count('"') % 2:
+            quoted = not quoted
+
+        if not quoted:
+            yield ''.join(record)
+            record.clear()
+
+    if record:
+        yield ''.join(record)
+
+
+def skip_records(
+    records: Iterable[str],
+    rows: int,
+) -> Generator[str, None, None]:
+    """Skip the records of the first rows of a csv.
+
+    Arguments:
+        records {Iterable[str]} -- Records of the csv, without the header
+        rows {int} -- Number of rows to skip, empty records do not count
+
+    Yields:
+        Generator[str, None, None] -- Records after the skipped rows
+    """
+    records = iter(records)
+
+    skipped: int = 0
+    while skipped < rows:
+        record: Optional[str] = next(records, None)
+        if record is None:
+            return
+        if record.strip('\r\n'):
+            skipped += 1
+
+    yield from records
+
+
+def iter_chunks(
+    records: Iterable[str],
+    size: int,
+    start: int = 0,
+) -> Generator[Tuple[int, List[str]], None, None]:
+    """Split csv records into chunks of rows.
+
+    Empty records are skipped by the csv reader, so they are kept in the
+    chunk but not counted as a row.
+
+    Arguments:
+        records {Iterable[str]} -- Records of the csv, without the header
+        size {int} -- Number of rows per chunk
+
+    Keyword Arguments:
+        start {int} -- Row number of the first record (default: {0})
+
+    Yields:
+        Generator[Tuple[int, List[str]], None, None] -- Row number of the
+            first row in the chunk and the records of the chunk
+    """
+    chunk: List[str] = []
+    first_row: int = start
+    rows: int = start
+
+    for record in records:
+        chunk.append(record)
+
+        if record.strip('\r\n'):
+            rows += 1
+
+        if rows - first_row >= size:
+            yield first_row, chunk
+            chunk = []
+            first_row = rows
+
+    if chunk:
+        yield first_row, chunk
+
+
+def clean_chunk(  # noqa: WPS211
+    cleaner: Optional[Callable],
+    header: str,
+    records: List[str],
+    first_row: int,
+    csv_url: str,
+    compiler: Optional[Callable] = None,
+) -> List[dict]:
+    """Clean a chunk of csv records, runs in a process pool.
+
+    Arguments:
+        cleaner {Optional[Callable]} -- Cleaner function
+        header {str} -- Header record of the csv
+        records {List[str]} -- Records of the chunk
+        first_row {int} -- Row number of the first row in the chunk
+        csv_url {str} -- The URL that points to the correct CSV file
+
+    Keyword Arguments:
+        compiler {Optional[Callable]} -- Cleaner compiler, used instead of
+            the cleaner (default: {None})
+
+    Returns:
+        List[dict] -- Cleaned rows
+    """
+    fieldnames: List[str] = next(reader([header]))
+
+    # Empty rows are skipped, like in a DictReader
+    if compiler:
+        clean: Callable = compiler(fieldnames, csv_url)
+        return [
+            clean(row, row_number)
+            for row_number, row in enumerate(
+                filter(None, reader(records)),
+                first_row,
+            )
+        ]
+
+    csv: DictReader = DictReader(records, fieldnames=fieldnames)
+
+    return [
+        cleaner(row, row_number, csv_url)
+        for row_number, row in enumerate(csv, first_row)
+    ]
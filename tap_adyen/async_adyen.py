@@ -0,0 +1,882 @@
+"""Asynchronous Adyen API Client."""
+# -*- coding: utf-8 -*-
+
+import asyncio
+from collections import deque
+from csv import DictReader, reader
+from functools import partial
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import httpx
+from httpx._decoders import TextDecoder  # noqa: WPS436
+
+from tap_adyen.adyen import (
+    API_PATH_DISPUTE_REPORT,
+    API_PATH_PAYMENT_REPORT,
+    API_PATH_SETTLEMENT_REPORT,
+    HEADERS,
+    Adyen,
+    FrontierSearch,
+    frontier_search,
+    is_continuation,
+    iter_records,
+    range_validator,
+)
+from tap_adyen.cache import CacheWriter
+from tap_adyen.controller import RETRY_ERRORS
+
+
+class AsyncAdyen(Adyen):
+    """Asynchronous Adyen API Client.
+
+    The report URL generators and retrieve_csv are async generators, so that
+    probing, downloading and cleaning of different reports can overlap on
+    one event loop.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize asynchronous Adyen client.
+
+        Arguments:
+            args -- Positional arguments of the Adyen client
+            kwargs -- Keyword arguments of the Adyen client
+        """
+        super().__init__(*args, **kwargs)
+
+        # Replace the web client with an asynchronous one
+        self.client.close()
+        self.client: httpx.AsyncClient = (  # type: ignore
+            self.connection.async_client()
+        )
+
+    async def __aenter__(self) -> 'AsyncAdyen':
+        """Enter the client context.
+
+        Returns:
+            AsyncAdyen -- The client
+        """
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the web client when leaving the client context.
+
+        Arguments:
+            exc_info -- Exception information
+        """
+        await self.client.aclose()
+
+    async def warm_up(self) -> None:  # type: ignore
+        """Set up the connection to Adyen before the first report."""
+        try:
+            response: httpx.Response = await self.client.head(
+                self._report_url(''),
+                auth=(self.report_user, self.user_password),
+                headers=dict(HEADERS),
+            )
+        except httpx.HTTPError as error:
+            self.logger.warning(f'Could not connect to Adyen: {error}')
+            return
+
+        self.logger.info(
+            f'Connected to {self.base_url} using {response.http_version}',
+        )
+
+    async def dispute_transaction_details(  # type: ignore
+        self,
+        start_date: str,
+    ) -> AsyncGenerator[str, None]:
+        """Get the dispute transaction report URLS.
+
+        Arguments:
+            start_date {str} -- Starting date to start generating urls from
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of dispute transaction reports
+        """
+        self.logger.info(
+            'Looking for dispute transaction details reports. Starting with '
+            f'date: {start_date}',
+        )
+
+        async for url in self._probe_reports(
+            self._date_locator(API_PATH_DISPUTE_REPORT, start_date),
+            'dispute transaction details report date',
+        ):
+            yield url
+
+        self.logger.info('Finished: Dispute Transaction Reports')
+
+    async def payment_accounting(  # type: ignore
+        self,
+        start_date: str,
+    ) -> AsyncGenerator[str, None]:
+        """Get the Payment Accounting Report URLS.
+
+        Arguments:
+            start_date {str} -- starting date to start generating urls from
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of payment accountinng reports
+        """
+        self.logger.info(
+            'Looking for payment accounting reports. Starting with date: '
+            f'{start_date}',
+        )
+
+        async for url in self._probe_reports(
+            self._date_locator(API_PATH_PAYMENT_REPORT, start_date),
+            'payment accounting report date',
+        ):
+            yield url
+
+        self.logger.info('Finished: Payment Accounting Reports')
+
+    async def settlement_details(  # type: ignore
+        self,
+        batch_number: int,
+    ) -> AsyncGenerator[str, None]:
+        """Get the settlement details report URLs.
+
+        Arguments:
+            batch_number {int} -- Batch number to start generating urls from
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of settlement detail reports
+        """
+        self.logger.info(
+            'Looking for settlement details reports. Starting with batch: '
+            f'{batch_number}',
+        )
+
+        async for url in self._probe_reports(
+            self._batch_locator(API_PATH_SETTLEMENT_REPORT, batch_number),
+            'settlement details report batch',
+        ):
+            yield url
+
+        self.logger.info('Finished retrieving Settlement Details Reports')
+
+    async def retrieve_csv(  # type: ignore # noqa: WPS210, WPS231
+        self,
+        csv_url: str,
+        cleaner: Optional[Callable],
+        compiler: Optional[Callable] = None,
+        skip_rows: int = 0,
+    ) -> AsyncGenerator[dict, None]:
+        """Download the csv.
+
+        Arguments:
+            csv_url {str} -- The URL that points to the correct CSV file
+            cleaner {Optional[Callable]} -- Optional cleaner function
+
+        Keyword Arguments:
+            compiler {Optional[Callable]} -- Optional cleaner compiler, used
+                instead of the cleaner (default: {None})
+            skip_rows {int} -- Number of rows at the start of the csv that
+                are skipped without cleaning them, the row numbers of the
+                other rows do not change (default: {0})
+
+        Yields:
+            AsyncGenerator[dict, None] -- Yields Adyen csvs
+        """
+        self.logger.info(f'Downloading report: {csv_url}')
+
+        # Stream the csv, so that it never has to fit in memory
+        response: httpx.Response = await self._open_download(csv_url)
+        try:
+
+            # The frontier search hands out URLs of missing reports within
+            # the range, these are skipped
+            frontier: bool = self.probe_strategy == 'frontier'
+            if response.status_code == 404 and frontier:  # noqa: WPS432
+                self.logger.info(f'Report not found, skipping: {csv_url}')
+                return
+
+            # If the status is not 200 or 304 raise the status
+            if response.status_code not in {200, 304}:  # noqa: WPS432
+                self.logger.critical(
+                    'Unexpected HTTP status code while downloading: '
+                    f'{csv_url}. ({response.status_code})',
+                )
+                response.raise_for_status()
+
+            # The csv reader pulls complete records from this queue, so it
+            # never runs out of lines halfway through a record
+            records: RecordQueue = RecordQueue()
+            row_number: int = 0
+            chunks: AsyncIterator[str] = self._report_text(  # type: ignore
+                response,
+                csv_url,
+            )
+            if self.profiler:
+                chunks = self.profiler.aiterate(chunks, 'download', csv_url)
+
+            # Compile a cleaner for the header of the csv
+            if compiler:
+                rows: Iterator[List[str]] = reader(records, delimiter=',')
+                if self.profiler:
+                    rows = self.profiler.iterate(rows, 'parse', csv_url)
+                clean: Optional[Callable] = None
+
+                async for record in aiter_records(chunks):
+                    records.append(record)
+
+                    for row in rows:
+                        if clean is None:
+                            clean = compiler(row, csv_url)
+                            if self.profiler:
+                                clean = self.profiler.wrap(
+                                    clean,
+                                    'clean',
+                                    csv_url,
+                                )
+
+                        # Empty rows are skipped, like in a DictReader
+                        elif row:
+                            if row_number >= skip_rows:
+                                yield clean(row, row_number)
+                            row_number += 1
+                return
+
+            csv: Iterator[dict] = DictReader(records, delimiter=',')
+            if self.profiler:
+                csv = self.profiler.iterate(csv, 'parse', csv_url)
+                if cleaner:
+                    cleaner = self.profiler.wrap(cleaner, 'clean', csv_url)
+
+            async for record in aiter_records(chunks):
+                records.append(record)
+
+                for row in csv:
+                    # Skip the rows before skip_rows
+                    if row_number < skip_rows:
+                        pass  # noqa: WPS420
+
+                    # Clean every row in the csv
+                    elif cleaner:
+                        yield cleaner(row, row_number, csv_url)
+
+                    # Return every row in the csv
+                    else:
+                        yield row
+
+                    row_number += 1
+        finally:
+            await response.aclose()
+
+    async def _open_download(  # type: ignore
+        self,
+        csv_url: str,
+    ) -> httpx.Response:
+        """Start the streamed download of a report.
+
+        Arguments:
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Returns:
+            httpx.Response -- Streamed GET response, must be closed
+        """
+        # The download may have been started while looking for the report
+        started: Optional[httpx.Response] = self.downloads.pop(csv_url, None)
+        if started is not None:
+            return started
+
+        return await self.controller.asend(partial(
+            self.client.send,
+            self.client.build_request(
+                'GET',
+                csv_url,
+                headers=self._download_headers(csv_url),
+            ),
+            stream=True,
+            auth=(self.report_user, self.user_password),
+        ))
+
+    async def _report_text(  # type: ignore
+        self,
+        response: httpx.Response,
+        csv_url: str,
+    ) -> AsyncGenerator[str, None]:
+        """Return the text of a downloaded report.
+
+        Arguments:
+            response {httpx.Response} -- Streamed GET response
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Yields:
+            AsyncGenerator[str, None] -- Text chunks of the report
+        """
+        if self.report_cache is None:
+            async for chunk in self._aiter_text(response, csv_url):
+                yield chunk
+            return
+
+        # The report did not change, read it from the cache
+        if response.status_code == 304:  # noqa: WPS432
+            self.logger.info(f'Report not modified, using cache: {csv_url}')
+            for cached in self.report_cache.read(csv_url):
+                yield cached
+            return
+
+        # Store the report while it is being downloaded
+        writer: Optional[CacheWriter] = self.report_cache.writer(
+            csv_url,
+            response.headers,
+        )
+        try:
+            async for text in self._aiter_text(response, csv_url):
+                if writer:
+                    writer.write(text)
+                yield text
+        except BaseException:
+            if writer:
+                writer.discard()
+            raise
+
+        if writer:
+            writer.commit()
+
+    async def _aiter_text(  # noqa: WPS231
+        self,
+        response: httpx.Response,
+        csv_url: str,
+    ) -> AsyncGenerator[str, None]:
+        """Decode a report while it downloads, resuming broken downloads.
+
+        Arguments:
+            response {httpx.Response} -- Streamed GET response
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Yields:
+            AsyncGenerator[str, None] -- Text chunks of the report
+        """
+        decoder: TextDecoder = TextDecoder(encoding=response.encoding)
+        received: int = 0
+        resumes: int = 0
+        validator: Optional[str] = range_validator(response)
+        max_resumes: int = self.controller.max_retries if validator else 0
+
+        try:
+            while True:  # noqa: WPS457
+                try:
+                    async for chunk in response.aiter_bytes():
+                        received += len(chunk)
+                        text: str = decoder.decode(chunk)
+                        if text:
+                            yield text
+                    break
+                except RETRY_ERRORS as error:
+                    resumes += 1
+                    if resumes > max_resumes:
+                        raise
+
+                    self.logger.warning(
+                        f'Download broke after {received} bytes ({error!r}), '
+                        f'resuming: {csv_url}',
+                    )
+                    await response.aclose()
+                    response = await self.controller.asend(partial(
+                        self.client.send,
+                        self.client.build_request(
+                            'GET',
+                            csv_url,
+                            headers={
+                                **HEADERS,
+                                'Range': f'bytes={received}-',
+                                'If-Range': validator,  # type: ignore
+                            },
+                        ),
+                        stream=True,
+                        auth=(self.report_user, self.user_password),
+                    ))
+
+                    # Only the rest of the same report can be used
+                    if not is_continuation(response, received):
+                        raise
+        finally:
+            await response.aclose()
+            if self.metrics:
+                self.metrics.inc('tap_adyen_downloaded_bytes_total', received)
+
+        tail: str = decoder.flush()
+        if tail:
+            yield tail
+
+    async def _probe_reports(  # type: ignore # noqa: WPS210, WPS231
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+    ) -> AsyncGenerator[str, None]:
+        """Yield report URLs in order until the last existing report.
+
+        Up to probe_concurrency HEAD requests are kept in flight. The answers
+        are handled in order, missing reports are looked past using the
+        probe_lookahead.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of existing reports
+        """
+        # Search the newest report first, then hand out all URLs up to it
+        if self.probe_strategy == 'frontier':
+            async for url in self._probe_frontier(locate, description):
+                yield url
+            return
+
+        # Use the download of each report as its probe
+        if self.probe_strategy == 'download':
+            async for download_url in self._probe_downloads(
+                locate,
+                description,
+            ):
+                yield download_url
+            return
+
+        window: Deque[Tuple[str, str, int, asyncio.Task]] = deque()
+        next_offset: int = 0
+
+        def submit() -> None:  # noqa: WPS430
+            nonlocal next_offset
+            key, url = locate(next_offset)
+            window.append((
+                key,
+                url,
+                next_offset,
+                asyncio.ensure_future(self._check(url)),
+            ))
+            next_offset += 1
+
+        try:
+            # Fill the window
+            for _ in range(max(self.probe_concurrency, 1)):
+                submit()
+
+            while window:
+                key, url, offset, task = window.popleft()
+
+                # Wait for the oldest check in the window
+                try:
+                    exists: bool = await task
+                except httpx.RequestError:
+                    self.logger.critical(
+                        f'Died when looking for {description}: {key}',
+                    )
+                    raise
+
+                # Slide the window
+                if self._report_exists(exists, description, key):
+                    submit()
+                    yield url
+                    continue
+
+                # Look past the missing report for the next existing one
+                for pending in window:
+                    pending[3].cancel()
+                window.clear()
+
+                found: Optional[int] = await self._skip_gap(
+                    locate,
+                    description,
+                    offset,
+                )
+                if found is None:
+                    return
+
+                # Continue the walk from the next existing report
+                next_offset = found
+                for _ in range(max(self.probe_concurrency, 1)):
+                    submit()
+        finally:
+            # Drop the probes that are still in flight
+            for _, _, _, pending_task in window:
+                pending_task.cancel()
+
+    async def _probe_downloads(  # type: ignore # noqa: WPS210, WPS231
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+    ) -> AsyncGenerator[str, None]:
+        """Yield report URLs, using the download of each report as probe.
+
+        The downloads of the next download_window reports are started ahead.
+        The answers are handled in order, missing reports are looked past
+        using the probe_lookahead.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of existing reports
+        """
+        window: Deque[Tuple[str, str, int, asyncio.Task]] = deque()
+        started: List[str] = []
+        next_offset: int = 0
+
+        def submit() -> None:  # noqa: WPS430
+            nonlocal next_offset
+            key, url = locate(next_offset)
+            window.append((
+                key,
+                url,
+                next_offset,
+                asyncio.ensure_future(self._start_download(url)),
+            ))
+            next_offset += 1
+
+        try:
+            # Fill the window
+            for _ in range(self.download_window):
+                submit()
+
+            while window:
+                key, url, offset, task = window.popleft()
+
+                # Wait for the oldest download in the window
+                try:
+                    exists: bool = await task
+                except httpx.RequestError:
+                    self.logger.critical(
+                        f'Died when looking for {description}: {key}',
+                    )
+                    raise
+
+                # Yield the URL, retrieve_csv continues the download
+                if self._report_exists(exists, description, key):
+                    submit()
+                    started.append(url)
+                    yield url
+                    continue
+
+                # Look past the missing report for the next existing one
+                await self._close_ahead(window)
+                found: Optional[int] = await self._skip_gap(
+                    locate,
+                    description,
+                    offset,
+                )
+                if found is None:
+                    return
+
+                # Continue the walk from the next existing report
+                next_offset = found
+                for _ in range(self.download_window):
+                    submit()
+        except BaseException:
+            # Close the downloads that were not continued
+            for started_url in started:
+                if started_url in self.downloads:
+                    await self.downloads.pop(started_url).aclose()
+            raise
+        finally:
+            await self._close_ahead(window)
+
+    async def _close_ahead(
+        self,
+        window: Deque[Tuple[str, str, int, asyncio.Task]],
+    ) -> None:
+        """Stop and close the downloads that were started ahead.
+
+        Arguments:
+            window {Deque[Tuple[str, str, int, asyncio.Task]]} -- Downloads
+                that were started ahead
+        """
+        for _, _, _, pending in window:
+            pending.cancel()
+        await asyncio.gather(
+            *(pending_task for _, _, _, pending_task in window),
+            return_exceptions=True,
+        )
+
+        for _, url, _, _ in window:
+            if url in self.downloads:
+                await self.downloads.pop(url).aclose()
+        window.clear()
+
+    async def _start_download(self, url: str) -> bool:  # type: ignore
+        """Start the download of a report, if it exists.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            bool -- Whether the report exists, the open response is kept in
+                downloads if it does
+        """
+        # Reports that were recently found missing are not requested again
+        if self.inventory and self.inventory.exists(url) is False:
+            return False
+
+        response: httpx.Response = await self._open_download(url)
+
+        # A cached report that did not change
+        exists: bool = response.status_code == 304  # noqa: WPS432
+        try:
+            exists = exists or self._exists(response)
+        except BaseException:
+            await response.aclose()
+            raise
+
+        if self.inventory:
+            self._record(url, exists, response)
+
+        if not exists:
+            await response.aclose()
+            return False
+
+        self.downloads[url] = response
+        return True
+
+    async def _skip_gap(  # type: ignore
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+        missing: int,
+    ) -> Optional[int]:
+        """Look past a missing report for the next existing report.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+            missing {int} -- Offset of the missing report
+
+        Returns:
+            Optional[int] -- Offset of the next existing report, if any
+        """
+        if not self.probe_lookahead:
+            return None
+
+        offsets: List[int] = list(
+            range(missing + 1, missing + self.probe_lookahead + 1),
+        )
+
+        try:
+            found: List[bool] = await self._probe_many(
+                [locate(offset)[1] for offset in offsets],
+            )
+        except httpx.RequestError:
+            self.logger.critical(
+                f'Died when looking past {description}: '
+                f'{locate(missing)[0]}',
+            )
+            raise
+
+        for offset, exists in zip(offsets, found):
+            if exists:
+                self.logger.info(
+                    f'Skipping missing {description}: {locate(missing)[0]} '
+                    f'up to {locate(offset)[0]}',
+                )
+                return offset
+
+        return None
+
+    async def _probe_frontier(  # type: ignore # noqa: WPS210
+        self,
+        locate: Callable[[int], Tuple[str, str]],
+        description: str,
+    ) -> AsyncGenerator[str, None]:
+        """Yield report URLs up to the newest report.
+
+        Arguments:
+            locate {Callable[[int], Tuple[str, str]]} -- Report locator
+            description {str} -- Report description, used for logging
+
+        Yields:
+            AsyncGenerator[str, None] -- Urls of reports up to the newest
+        """
+        search: FrontierSearch = frontier_search(self.probe_lookahead)
+        requests: int = 0
+
+        # Probe the offsets the search asks for, until it returns the newest
+        try:
+            offsets: List[int] = next(search)
+            while True:
+                requests += len(offsets)
+                offsets = search.send(await self._probe_many(
+                    [locate(offset)[1] for offset in offsets],
+                ))
+        except StopIteration as search_result:
+            newest: Optional[int] = search_result.value
+        except httpx.RequestError:
+            self.logger.critical(
+                f'Died when searching for the newest {description}',
+            )
+            raise
+
+        # No reports at all
+        if newest is None:
+            self.logger.debug(
+                f'{description.capitalize()}: {locate(0)[0]} not found, '
+                'stopping.',
+            )
+            return
+
+        self.logger.info(
+            f'Found newest {description}: {locate(newest)[0]} '
+            f'({requests} HEAD requests)',
+        )
+
+        for offset in range(newest + 1):
+            yield locate(offset)[1]
+
+    async def _probe_many(  # type: ignore
+        self,
+        urls: List[str],
+    ) -> List[bool]:
+        """Check whether reports exist.
+
+        Arguments:
+            urls {List[str]} -- Report URLs
+
+        Returns:
+            List[bool] -- Whether each report exists
+        """
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(
+            max(self.probe_concurrency, 1),
+        )
+
+        async def probe(url: str) -> bool:  # noqa: WPS430
+            async with semaphore:
+                return await self._check(url)
+
+        return list(await asyncio.gather(*(probe(url) for url in urls)))
+
+    async def _check(self, url: str) -> bool:  # type: ignore
+        """Check whether a report exists, using the inventory if possible.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            bool -- Whether the report exists
+        """
+        if self.inventory is None:
+            return self._exists(await self._head_request(url))
+
+        # Known reports are not probed again
+        known: Optional[bool] = self.inventory.exists(url)
+        if known is not None:
+            return known
+
+        response: httpx.Response = await self._head_request(url)
+        exists: bool = self._exists(response)
+        self._record(url, exists, response)
+        return exists
+
+    async def _head_request(  # type: ignore
+        self,
+        url: str,
+    ) -> httpx.Response:
+        """Perform a HEAD request.
+
+        Arguments:
+            url {str} -- Input url
+
+        Returns:
+            httpx.Response -- Response of HEAD request
+        """
+        return await self.controller.asend(partial(
+            self.client.head,
+            url,
+            auth=(self.report_user, self.user_password),
+            headers=dict(HEADERS),
+        ))
+
+
+class RecordQueue(object):
+    """Queue of csv records that the csv reader can iterate over.
+
+    Iteration stops when the queue is empty, but continues once new records
+    have been appended.
+    """
+
+    def __init__(self) -> None:
+        """Initialize record queue."""
+        self.records: Deque[str] = deque()
+
+    def __iter__(self) -> 'RecordQueue':
+        """Iterate over the queued records.
+
+        Returns:
+            RecordQueue -- The queue itself
+        """
+        return self
+
+    def __next__(self) -> str:
+        """Pop the oldest record.
+
+        Raises:
+            StopIteration: The queue is empty
+
+        Returns:
+            str -- Record
+        """
+        if not self.records:
+            raise StopIteration
+        return self.records.popleft()
+
+    def append(self, record: str) -> None:
+        """Add a record to the queue.
+
+        Arguments:
+            record {str} -- Record
+        """
+        self.records.append(record)
+
+
+async def aiter_records(
+    chunks: AsyncIterable[str],
+) -> AsyncGenerator[str, None]:
+    """Split decoded text chunks into complete csv records.
+
+    Arguments:
+        chunks {AsyncIterable[str]} -- Decoded text chunks
+
+    Yields:
+        AsyncGenerator[str, None] -- Records, with line endings
+    """
+    pending: str = ''
+    partial: List[str] = []
+
+    async for chunk in chunks:
+        lines: List[str] = (pending + chunk).splitlines(keepends=True)
+
+        # The last line may continue in the next chunk
+        pending = lines.pop() if lines else ''
+
+        # A record may continue in the next chunk
+        records: List[str] = list(iter_records(partial + lines))
+        partial = [records.pop()] if records and _is_open(records[-1]) else []
+
+        for record in records:
+            yield record
+
+    for record in iter_records(partial + [pending]):
+        if record:
+            yield record
+
+
+def _is_open(record: str) -> bool:
+    """Check whether a record ends inside a quoted value.
+
+    Arguments:
+        record {str} -- Record
+
+    Returns:
+        bool -- Whether the record is incomplete
+    """
+    return record.count('"') % 2 == 1
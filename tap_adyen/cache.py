@@ -0,0 +1,242 @@
+"""Raw report cache."""
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import time
+from typing import Generator, Iterable, List, Mapping, Optional, TextIO
+
+# Size of the chunks read from a cached report
+CACHE_CHUNK_SIZE: int = 65536
+
+
+class ReportCache(object):
+    """Cache of raw report bodies on disk.
+
+    Reports are keyed by their URL and stored with the ETag and
+    Last-Modified headers of the response, so that later downloads can be
+    conditional GET requests. When Adyen answers 304 Not Modified, the report
+    is read from disk. The least recently used reports are removed once the
+    cache grows beyond max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize report cache.
+
+        Arguments:
+            directory {str} -- Directory to store the reports in
+            max_bytes {int} -- Maximum total size of the cached reports
+        """
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+
+    def headers(self, url: str) -> dict:
+        """Return the headers for a conditional GET request of a report.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            dict -- Conditional request headers, empty when not cached
+        """
+        metadata: Optional[dict] = self._metadata(url)
+        if metadata is None:
+            return {}
+
+        headers: dict = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+
+    def read(self, url: str) -> Generator[str, None, None]:
+        """Read a cached report.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Yields:
+            Generator[str, None, None] -- Text chunks of the report
+        """
+        path: str = self._path(url)
+
+        # Mark the report as recently used
+        os.utime(f'{path}.json')
+
+        with open(f'{path}.csv', encoding='utf-8', newline='') as body:
+            chunk: str = body.read(CACHE_CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = body.read(CACHE_CHUNK_SIZE)
+
+    def tee(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        chunks: Iterable[str],
+    ) -> Generator[str, None, None]:
+        """Pass on the text chunks of a report while storing them.
+
+        The report is only stored when all chunks have been passed on and
+        the response has an ETag or Last-Modified header.
+
+        Arguments:
+            url {str} -- Report URL
+            headers {Mapping[str, str]} -- Response headers
+            chunks {Iterable[str]} -- Text chunks of the report
+
+        Yields:
+            Generator[str, None, None] -- Text chunks of the report
+        """
+        writer: Optional[CacheWriter] = self.writer(url, headers)
+        if writer is None:
+            yield from chunks
+            return
+
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+        except BaseException:
+            writer.discard()
+            raise
+
+        writer.commit()
+
+    def writer(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> Optional['CacheWriter']:
+        """Start storing a report.
+
+        Arguments:
+            url {str} -- Report URL
+            headers {Mapping[str, str]} -- Response headers
+
+        Returns:
+            Optional[CacheWriter] -- Writer, None if the report can not be
+                validated later
+        """
+        etag: Optional[str] = headers.get('etag')
+        last_modified: Optional[str] = headers.get('last-modified')
+        if not etag and not last_modified:
+            return None
+
+        return CacheWriter(self, url, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+        })
+
+    def evict(self) -> None:
+        """Remove the least recently used reports above max_bytes."""
+        entries: List[tuple] = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            path: str = os.path.join(self.directory, filename[:-5])
+            try:
+                entries.append((
+                    os.path.getmtime(f'{path}.json'),
+                    os.path.getsize(f'{path}.csv'),
+                    path,
+                ))
+            except OSError:
+                continue
+
+        total: int = sum(size for _, size, _ in entries)
+
+        # Oldest first
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for extension in ('.json', '.csv'):
+                try:
+                    os.remove(f'{path}{extension}')
+                except OSError:
+                    pass  # noqa: WPS420
+            total -= size
+
+    def _metadata(self, url: str) -> Optional[dict]:
+        """Return the metadata of a cached report.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            Optional[dict] -- Metadata, None when not cached
+        """
+        path: str = self._path(url)
+        if not os.path.exists(f'{path}.csv'):
+            return None
+
+        try:
+            with open(f'{path}.json') as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def _path(self, url: str) -> str:
+        """Return the path of a cached report, without extension.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            str -- Path
+        """
+        return os.path.join(
+            self.directory,
+            hashlib.sha256(url.encode('utf-8')).hexdigest(),
+        )
+
+
+class CacheWriter(object):
+    """Stores a report in the cache while it is downloaded."""
+
+    def __init__(self, cache: ReportCache, url: str, metadata: dict) -> None:
+        """Initialize cache writer.
+
+        Arguments:
+            cache {ReportCache} -- Report cache
+            url {str} -- Report URL
+            metadata {dict} -- Metadata of the report
+        """
+        self.cache: ReportCache = cache
+        self.metadata: dict = metadata
+        self.path: str = cache._path(url)  # noqa: WPS437
+        self.body: TextIO = open(  # noqa: WPS515
+            f'{self.path}.csv.tmp',
+            'w',
+            encoding='utf-8',
+            newline='',
+        )
+
+    def write(self, chunk: str) -> None:
+        """Store a text chunk of the report.
+
+        Arguments:
+            chunk {str} -- Text chunk
+        """
+        self.body.write(chunk)
+
+    def commit(self) -> None:
+        """Store the complete report and evict old reports."""
+        self.body.close()
+        os.replace(f'{self.path}.csv.tmp', f'{self.path}.csv')
+
+        self.metadata['size'] = os.path.getsize(f'{self.path}.csv')
+        self.metadata['stored_at'] = time.time()
+        with open(f'{self.path}.json', 'w') as metadata_file:
+            json.dump(self.metadata, metadata_file)
+
+        self.cache.evict()
+
+    def discard(self) -> None:
+        """Remove the incomplete report."""
+        self.body.close()
+        os.remove(f'{self.path}.csv.tmp')
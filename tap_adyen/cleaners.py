@@ -2,8 +2,9 @@
 # -*- coding: utf-8 -*-
 
 from datetime import date
+from functools import lru_cache, partial
 from types import MappingProxyType
-from typing import Any, Optional
+from typing import Any, Callable, FrozenSet, List, Optional, Tuple
 
 from dateutil.parser import parse as parse_date
 
@@ -13,6 +14,23 @@ from tap_adyen.streams import STREAMS
 class ConvertionError(ValueError):
     """Failed to convert value."""
 
+    def __init__(self, message: str, column: Optional[str] = None) -> None:
+        """Initialize conversion error.
+
+        Arguments:
+            message {str} -- Error message
+
+        Keyword Arguments:
+            column {Optional[str]} -- Column of the value, when known
+                (default: {None})
+        """
+        super().__init__(message)
+        self.column: Optional[str] = column
+
+
+class HeaderMismatchError(ValueError):
+    """The csv header does not match the mapping."""
+
 
 def to_type_or_null(
     input_value: Any,
@@ -84,19 +102,52 @@ def clean_row(row: dict, mapping: dict) -> dict:
         new_mapping: str = key_mapping.get('map') or key
 
         # Convert the value
-        cleaned[new_mapping] = to_type_or_null(
-            row[key],
-            key_mapping.get('type'),
-            key_mapping.get('null', True),
-        )
+        try:
+            cleaned[new_mapping] = to_type_or_null(
+                row[key],
+                key_mapping.get('type'),
+                key_mapping.get('null', True),
+            )
+        except ConvertionError as err:
+            err.column = new_mapping
+            raise
 
     return cleaned
 
 
+@lru_cache(maxsize=None)
+def selected_mapping(
+    stream_name: str,
+    selected: Optional[FrozenSet[str]] = None,
+) -> Optional[dict]:
+    """Return the mapping of a stream, limited to the selected fields.
+
+    Arguments:
+        stream_name {str} -- Stream name
+
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Output names of the selected
+            fields, None for every field (default: {None})
+
+    Returns:
+        Optional[dict] -- Mapping of the columns of the selected fields
+    """
+    mapping: Optional[dict] = STREAMS[stream_name].get('mapping')
+    if mapping is None or selected is None:
+        return mapping
+
+    return {
+        column: key_mapping
+        for column, key_mapping in mapping.items()
+        if (key_mapping.get('map') or column) in selected
+    }
+
+
 def clean_dispute_transaction_details(
     row: dict,
     row_number: int,
     csv_url: str,
+    selected: Optional[FrozenSet[str]] = None,
 ) -> dict:
     """Clean dispute transaction details.
 
@@ -105,12 +156,17 @@ def clean_dispute_transaction_details(
         row_number {int} -- Row number, used to construct primary key
         file_date {str} -- File name, used to construct primary key
 
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to clean and return,
+            None for every field (default: {None})
+
     Returns:
         dict -- Cleaned row
     """
     # Get the mapping from the STREAMS
-    mapping: Optional[dict] = STREAMS['dispute_transaction_details'].get(
-        'mapping',
+    mapping: Optional[dict] = selected_mapping(
+        'dispute_transaction_details',
+        selected,
     )
 
     # Get file date
@@ -153,6 +209,7 @@ def clean_payment_accounting(
     row: dict,
     row_number: int,
     csv_url: str,
+    selected: Optional[FrozenSet[str]] = None,
 ) -> dict:
     """Clean payment accounting.
 
@@ -161,11 +218,15 @@ def clean_payment_accounting(
         row_number {int} -- Row number, used to construct primary key
         csv_url {str} -- File name, used to construct primary key
 
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to clean and return,
+            None for every field (default: {None})
+
     Returns:
         dict -- Cleaned row
     """
     # Get the mapping from the STREAMS
-    mapping: Optional[dict] = STREAMS['payment_accounting'].get('mapping')
+    mapping: Optional[dict] = selected_mapping('payment_accounting', selected)
 
     # Get file date
     file_date: date = parse_date(csv_url.rstrip('.csv')[-10], fuzzy=True).date() # clamp end of string
@@ -193,6 +254,7 @@ def clean_settlement_details(
     row: dict,
     row_number: int,
     _: str,
+    selected: Optional[FrozenSet[str]] = None,
 ) -> dict:
     """Clean settlement details.
 
@@ -200,11 +262,15 @@ def clean_settlement_details(
         row {dict} -- Input row
         row_number {int} -- Row number, used to construct primary key
 
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to clean and return,
+            None for every field (default: {None})
+
     Returns:
         dict -- Cleaned row
     """
     # Get the mapping from the STREAMS
-    mapping: Optional[dict] = STREAMS['settlement_details'].get('mapping')
+    mapping: Optional[dict] = selected_mapping('settlement_details', selected)
 
     # Create primary key
     number: str = str(row_number).rjust(10, '0')
@@ -224,6 +290,155 @@ def clean_settlement_details(
     return row
 
 
+def compile_cleaner(  # noqa: WPS210, WPS231
+    stream_name: str,
+    header: List[str],
+    csv_url: str,
+    selected: Optional[FrozenSet[str]] = None,
+) -> Callable[[List[str], int], dict]:
+    """Compile a cleaner for the rows of a single csv.
+
+    The compiled cleaner does the same as the cleaner in CLEANERS, but reads
+    the values from a plain csv row by column index. Everything that is the
+    same for every row of the csv, such as the column indices and the date
+    of the file, is computed once. Columns of fields that are not selected
+    are not converted at all.
+
+    Arguments:
+        stream_name {str} -- Stream name
+        header {List[str]} -- Header row of the csv
+        csv_url {str} -- File name, used to construct primary key
+
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to clean and return,
+            None for every field (default: {None})
+
+    Raises:
+        HeaderMismatchError: A column of the mapping is missing in the csv
+
+    Returns:
+        Callable[[List[str], int], dict] -- Cleans a row, given the row and
+            the row number
+    """
+    mapping: dict = STREAMS[stream_name]['mapping']
+
+    # The last column with a name wins, like in a DictReader
+    indices: dict = {column: index for index, column in enumerate(header)}
+    width: int = len(header)
+
+    # The id is added as an extra column
+    indices['id'] = width
+
+    # Fail fast when the csv does not match the mapping
+    missing: List[str] = [
+        column for column in mapping if column not in indices
+    ]
+    if missing:
+        raise HeaderMismatchError(
+            f'Columns missing in the {stream_name} csv: {", ".join(missing)}',
+        )
+
+    # Only the columns of the selected fields are converted
+    mapping = selected_mapping(stream_name, selected)
+
+    # Date columns that get the timezone added
+    dates: Tuple[Tuple[int, int], ...] = tuple(
+        (indices[date_column], indices[timezone_column])
+        for date_column, timezone_column in DATE_TIMEZONES[stream_name].items()
+        if date_column in mapping
+    )
+
+    # Output name, index, data type and nullable per column
+    columns: Tuple[Tuple[str, int, Any, bool], ...] = tuple(
+        (
+            key_mapping.get('map') or column,
+            indices[column],
+            key_mapping.get('type'),
+            key_mapping.get('null', True),
+        )
+        for column, key_mapping in mapping.items()
+    )
+
+    # The primary key is made of the file date or the batch number
+    create_id: Callable[[List[str], int], int]
+    if stream_name == 'settlement_details':
+        batch_index: int = indices['Batch Number']
+
+        def create_id(row: List[str], row_number: int) -> int:  # noqa: WPS430
+            return int(row[batch_index] + str(row_number).rjust(10, '0'))
+    else:
+        file_date: date = parse_date(
+            csv_url.rstrip('.csv')[-10],  # clamp end of string
+            fuzzy=True,
+        ).date()
+        date_string: str = '{date:%Y%m%d}'.format(  # noqa: WPS323
+            date=file_date,
+        )
+
+        def create_id(row: List[str], row_number: int) -> int:  # noqa: WPS430
+            return int(date_string + str(row_number).rjust(10, '0'))
+
+    def clean(row: List[str], row_number: int) -> dict:  # noqa: WPS430
+        # Missing values are None, like in a DictReader
+        if len(row) < width:
+            row = row + [None] * (width - len(row))
+
+        # Extra values have no column, like the restkey of a DictReader, and
+        # would otherwise take the place of the id
+        del row[width:]
+
+        row.append(create_id(row, row_number))
+
+        # Add timezone to the date, so that the datetime parser includes it
+        for date_index, timezone_index in dates:
+            row[date_index] = f'{row[date_index]} {row[timezone_index]}'
+
+        cleaned: dict = {}
+        for name, index, data_type, nullable in columns:
+            input_value: Any = row[index]
+
+            # Same conversion as to_type_or_null
+            if input_value and data_type:
+                try:
+                    cleaned[name] = data_type(input_value)
+                except ValueError as err:
+                    raise ConvertionError(
+                        f'Could not convert {input_value} to {data_type}: '
+                        f'{err}',
+                        column=name,
+                    )
+            elif not input_value and nullable:
+                cleaned[name] = None
+            else:
+                cleaned[name] = input_value
+
+        return cleaned
+
+    return clean
+
+
+# Date columns and the columns with their timezone
+DATE_TIMEZONES: MappingProxyType = MappingProxyType({
+    'dispute_transaction_details': {
+        'Record Date': 'Record Date TimeZone',
+        'Payment Date': 'Payment Date TimeZone',
+        'Dispute Date': 'Dispute Date TimeZone',
+        'Dispute End Date': 'Dispute End Date TimeZone',
+    },
+    'payment_accounting': {
+        'Booking Date': 'TimeZone',
+    },
+    'settlement_details': {
+        'Creation Date': 'TimeZone',
+    },
+})
+
+# Collect all cleaner compilers
+CLEANER_COMPILERS: MappingProxyType = MappingProxyType({
+    stream_name: partial(compile_cleaner, stream_name)
+    for stream_name in DATE_TIMEZONES
+})
+
 # Collect all cleaners
 CLEANERS: MappingProxyType = MappingProxyType({
     'dispute_transaction_details': clean_dispute_transaction_details,
@@ -0,0 +1,80 @@
+"""HTTP connection settings."""
+# -*- coding: utf-8 -*-
+from typing import Optional
+
+import httpx
+
+
+class ConnectionSettings(object):  # noqa: WPS230
+    """Settings of the connection pool and timeouts of the web client.
+
+    With HTTP/2, concurrent requests to Adyen are multiplexed over a single
+    connection, so the TLS and connection setup only happen once. Idle
+    connections are kept for keepalive_expiry seconds.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        http2: bool = True,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        connect_timeout: Optional[float] = 5.0,
+        read_timeout: Optional[float] = 5.0,
+        pool_timeout: Optional[float] = 5.0,
+    ) -> None:
+        """Initialize connection settings.
+
+        The defaults are the defaults of httpx. A timeout of None waits
+        forever.
+
+        Keyword Arguments:
+            http2 {bool} -- Whether to use HTTP/2 (default: {True})
+            max_connections {Optional[int]} -- Maximum number of connections
+                (default: {100})
+            max_keepalive_connections {Optional[int]} -- Maximum number of
+                idle connections that are kept (default: {20})
+            keepalive_expiry {Optional[float]} -- Seconds an idle connection
+                is kept (default: {5.0})
+            connect_timeout {Optional[float]} -- Seconds to set up a
+                connection (default: {5.0})
+            read_timeout {Optional[float]} -- Seconds to wait for data
+                (default: {5.0})
+            pool_timeout {Optional[float]} -- Seconds to wait for a
+                connection from the pool (default: {5.0})
+        """
+        self.http2: bool = http2
+        self.limits: httpx.Limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout: httpx.Timeout = httpx.Timeout(
+            read_timeout,
+            connect=connect_timeout,
+            pool=pool_timeout,
+        )
+
+    def client(self) -> httpx.Client:
+        """Create a web client.
+
+        Returns:
+            httpx.Client -- Web client
+        """
+        return httpx.Client(
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=self.limits,
+        )
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Create an asynchronous web client.
+
+        Returns:
+            httpx.AsyncClient -- Asynchronous web client
+        """
+        return httpx.AsyncClient(
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=self.limits,
+        )
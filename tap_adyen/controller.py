@@ -0,0 +1,368 @@
+"""Adaptive request controller."""
+# -*- coding: utf-8 -*-
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import singer
+
+from tap_adyen.metrics import Metrics
+
+# Statuses that mean Adyen is overloaded or rate limiting
+RETRY_STATUSES: frozenset = frozenset((429, 500, 502, 503, 504))
+
+# Errors that are worth retrying
+RETRY_ERRORS: tuple = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+
+# Seconds between two decreases of the concurrency limit
+DECREASE_COOLDOWN: float = 1.0
+
+
+class RequestController(object):  # noqa: WPS230
+    """Limit, throttle and retry the HEAD and GET requests to Adyen.
+
+    The number of concurrent requests is adjusted with additive increase and
+    multiplicative decrease: every fast, successful request raises the limit
+    by a fraction, so that it grows by one per round trip, and every 429, 5xx,
+    network error or request slower than latency_target halves it. A request
+    counts as finished once the response headers arrived.
+
+    Failed requests are retried with exponential backoff and full jitter. A
+    Retry-After header pauses all requests for the given time.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        max_concurrency: int = 32,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        latency_target: float = 10.0,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize request controller.
+
+        Keyword Arguments:
+            max_concurrency {int} -- Maximum number of concurrent requests
+                (default: {32})
+            min_concurrency {int} -- Minimum number of concurrent requests
+                (default: {1})
+            max_retries {int} -- Retries of a failed request (default: {5})
+            backoff {float} -- Seconds of the first retry delay
+                (default: {0.5})
+            max_backoff {float} -- Maximum seconds of a retry delay
+                (default: {60.0})
+            latency_target {float} -- Seconds until the response headers
+                above which the limit is decreased (default: {10.0})
+            metrics {Optional[Metrics]} -- Records the latency of every
+                request by method and status (default: {None})
+        """
+        self.max_concurrency: int = max(max_concurrency, 1)
+        self.min_concurrency: int = min(
+            max(min_concurrency, 1),
+            self.max_concurrency,
+        )
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.latency_target: float = latency_target
+        self.metrics: Optional[Metrics] = metrics
+
+        # Start optimistic, the first failures halve the limit quickly
+        self.limit: float = float(self.max_concurrency)
+        self.in_flight: int = 0
+        self.paused_until: float = 0
+        self.decreased_at: float = 0
+
+        # Requests are sent from threads or from an event loop
+        self.condition: threading.Condition = threading.Condition()
+        self.async_condition: Optional[asyncio.Condition] = None
+
+        # Setup logger
+        self.logger: logging.RootLogger = singer.get_logger()
+
+    def send(
+        self,
+        request: Callable[[], httpx.Response],
+    ) -> httpx.Response:
+        """Send a request, retrying it when it fails.
+
+        Arguments:
+            request {Callable[[], httpx.Response]} -- Sends the request
+
+        Raises:
+            RETRY_ERRORS: The last error, when all retries failed
+
+        Returns:
+            httpx.Response -- Response, the last one when all retries failed
+        """
+        attempt: int = 0
+        while True:  # noqa: WPS457
+            attempt += 1
+            self._acquire()
+            started: float = time.monotonic()
+
+            try:
+                response: httpx.Response = request()
+            except RETRY_ERRORS as error:
+                self._observe(started, error)
+                self._release(started, failed=True)
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt, error))
+                continue
+            except BaseException:
+                # Interrupted requests do not change the limit
+                self._release(started, failed=None)
+                raise
+
+            self._observe(started, response)
+            failed: bool = response.status_code in RETRY_STATUSES
+            self._release(started, failed=failed)
+            if not failed or attempt > self.max_retries:
+                return response
+
+            delay: float = self._retry_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+
+    async def asend(
+        self,
+        request: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Send an asynchronous request, retrying it when it fails.
+
+        Arguments:
+            request {Callable[[], Awaitable[httpx.Response]]} -- Sends the
+                request
+
+        Raises:
+            RETRY_ERRORS: The last error, when all retries failed
+
+        Returns:
+            httpx.Response -- Response, the last one when all retries failed
+        """
+        attempt: int = 0
+        while True:  # noqa: WPS457
+            attempt += 1
+            await self._aacquire()
+            started: float = time.monotonic()
+
+            try:
+                response: httpx.Response = await request()
+            except RETRY_ERRORS as error:
+                self._observe(started, error)
+                await self._arelease(started, failed=True)
+                if attempt > self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt, error))
+                continue
+            except BaseException:
+                # Interrupted requests do not change the limit
+                await self._arelease(started, failed=None)
+                raise
+
+            self._observe(started, response)
+            failed: bool = response.status_code in RETRY_STATUSES
+            await self._arelease(started, failed=failed)
+            if not failed or attempt > self.max_retries:
+                return response
+
+            delay: float = self._retry_delay(attempt, response)
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    def _acquire(self) -> None:
+        """Wait until a request may be sent."""
+        with self.condition:
+            while True:  # noqa: WPS457
+                paused: float = self.paused_until - time.monotonic()
+                if paused > 0:
+                    self.condition.wait(paused)
+                elif self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                else:
+                    self.condition.wait()
+
+    def _release(self, started: float, failed: Optional[bool]) -> None:
+        """Finish a request and adjust the limit.
+
+        Arguments:
+            started {float} -- Monotonic time the request was sent
+            failed {Optional[bool]} -- Whether the request failed, None if
+                it was interrupted
+        """
+        with self.condition:
+            self.in_flight -= 1
+            if failed is not None:
+                self._adjust(time.monotonic() - started, failed)
+            self.condition.notify_all()
+
+    async def _aacquire(self) -> None:
+        """Wait until an asynchronous request may be sent."""
+        # The condition belongs to the running event loop
+        if self.async_condition is None:
+            self.async_condition = asyncio.Condition()
+
+        async with self.async_condition:
+            while True:  # noqa: WPS457
+                paused: float = self.paused_until - time.monotonic()
+                if paused > 0:
+                    try:
+                        await asyncio.wait_for(
+                            self.async_condition.wait(),
+                            paused,
+                        )
+                    except asyncio.TimeoutError:
+                        pass  # noqa: WPS420
+                elif self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                else:
+                    await self.async_condition.wait()
+
+    async def _arelease(
+        self,
+        started: float,
+        failed: Optional[bool],
+    ) -> None:
+        """Finish an asynchronous request and adjust the limit.
+
+        Arguments:
+            started {float} -- Monotonic time the request was sent
+            failed {Optional[bool]} -- Whether the request failed, None if
+                it was interrupted
+        """
+        async with self.async_condition:  # type: ignore
+            self.in_flight -= 1
+            if failed is not None:
+                self._adjust(time.monotonic() - started, failed)
+            self.async_condition.notify_all()  # type: ignore
+
+    def _adjust(self, latency: float, failed: bool) -> None:
+        """Adjust the concurrency limit after a request.
+
+        Arguments:
+            latency {float} -- Seconds until the response headers arrived
+            failed {bool} -- Whether the request failed
+        """
+        now: float = time.monotonic()
+
+        # Additive increase, about one request per round trip
+        if not failed and latency <= self.latency_target:
+            self.limit = min(
+                self.limit + 1 / self.limit,
+                self.max_concurrency,
+            )
+
+        # Multiplicative decrease, once per burst of failures
+        elif now - self.decreased_at >= DECREASE_COOLDOWN:
+            self.limit = max(self.limit / 2, self.min_concurrency)
+            self.decreased_at = now
+            self.logger.info(
+                f'Lowered the request concurrency to {int(self.limit)}',
+            )
+
+    def _observe(self, started: float, outcome: object) -> None:
+        """Record the latency of a request.
+
+        Arguments:
+            started {float} -- Monotonic time the request was sent
+            outcome {object} -- Response or error of the request
+        """
+        if self.metrics is None:
+            return
+
+        method: str = 'unknown'
+        try:
+            method = outcome.request.method  # type: ignore
+        except (AttributeError, RuntimeError):
+            pass  # noqa: WPS420
+
+        # Errors have no status, their type is used instead
+        status: str = type(outcome).__name__
+        if isinstance(outcome, httpx.Response):
+            status = str(outcome.status_code)
+
+        self.metrics.observe(
+            'tap_adyen_request_duration_seconds',
+            time.monotonic() - started,
+            method=method,
+            status=status,
+        )
+
+    def _retry_delay(self, attempt: int, outcome: object) -> float:
+        """Return the delay before retrying a request.
+
+        Arguments:
+            attempt {int} -- Number of the failed attempt, starting at 1
+            outcome {object} -- Response or error of the failed attempt
+
+        Returns:
+            float -- Seconds to wait
+        """
+        retry_after: Optional[float] = None
+        if isinstance(outcome, httpx.Response):
+            retry_after = parse_retry_after(
+                outcome.headers.get('retry-after'),
+            )
+            reason: str = f'HTTP status {outcome.status_code}'
+        else:
+            reason = type(outcome).__name__
+
+        # Adyen asked to wait, pause all requests
+        if retry_after is not None:
+            with self.condition:
+                self.paused_until = max(
+                    self.paused_until,
+                    time.monotonic() + retry_after,
+                )
+            delay: float = retry_after
+
+        # Exponential backoff with full jitter
+        else:
+            delay = random.uniform(  # noqa: S311
+                0,
+                min(self.max_backoff, self.backoff * 2 ** (attempt - 1)),
+            )
+
+        self.logger.warning(
+            f'Request failed ({reason}), retry {attempt} of '
+            f'{self.max_retries} in {delay:.1f} seconds',
+        )
+        return delay
+
+
+def parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header.
+
+    Arguments:
+        retry_after {Optional[str]} -- Seconds or HTTP date
+
+    Returns:
+        Optional[float] -- Seconds to wait, if the header is valid
+    """
+    if not retry_after:
+        return None
+
+    if retry_after.strip().isdigit():
+        return float(retry_after)
+
+    try:
+        return max(
+            parsedate_to_datetime(retry_after).timestamp() - time.time(),
+            0,
+        )
+    except (TypeError, ValueError):
+        return None
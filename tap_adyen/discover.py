@@ -1,17 +1,89 @@
 """Discover."""
 # -*- coding: utf-8 -*-
+import json
+import os
+from typing import List, Optional
+
 from singer import metadata
 from singer.catalog import Catalog, CatalogEntry
-from tap_adyen.schema import load_schemas
-from tap_adyen.streams import STREAMS
+from tap_adyen.schema import get_abs_path, load_schemas
+
+# Version of the layout of the compiled catalog file
+CATALOG_FORMAT: int = 1
 
+# Compiled catalog, built on first use
+CATALOG_CACHE: str = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'tap-adyen',
+    'catalog.json',
+)
 
-def discover() -> Catalog:  # noqa: WPS210
+
+def discover(cache_path: Optional[str] = CATALOG_CACHE) -> Catalog:
     """Load the Stream catalog.
 
+    Keyword Arguments:
+        cache_path {Optional[str]} -- Path of the compiled catalog, None to
+            build the catalog without a cache (default: {CATALOG_CACHE})
+
     Returns:
         Catalog -- The catalog
     """
+    return Catalog.from_dict(compiled_catalog(cache_path))
+
+
+def compiled_catalog(cache_path: Optional[str] = CATALOG_CACHE) -> dict:
+    """Return the catalog as a dictionary, from the cache when it is current.
+
+    The cache holds the version of the schemas and stream metadata it was
+    built from. When they changed, for example after an upgrade, the catalog
+    is built again and the cache is replaced.
+
+    Keyword Arguments:
+        cache_path {Optional[str]} -- Path of the compiled catalog, None to
+            build the catalog without a cache (default: {CATALOG_CACHE})
+
+    Returns:
+        dict -- The catalog
+    """
+    if cache_path is None:
+        return build_catalog()
+
+    version: str = catalog_version()
+
+    # Load the compiled catalog
+    try:
+        with open(cache_path) as cache_file:
+            cached: dict = json.load(cache_file)
+    except (OSError, ValueError):
+        cached = {}
+    if cached.get('version') == version:
+        return cached['catalog']
+
+    catalog: dict = build_catalog()
+
+    # Store the catalog for the next run, a read-only cache is not an error
+    temporary_path: str = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temporary_path, 'w') as cache_file:
+            json.dump({'version': version, 'catalog': catalog}, cache_file)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        pass  # noqa: WPS420
+
+    return catalog
+
+
+def build_catalog() -> dict:  # noqa: WPS210
+    """Build the catalog from the schemas and the stream metadata.
+
+    Returns:
+        dict -- The catalog
+    """
+    # The stream table is only needed to build the catalog
+    from tap_adyen.streams import STREAMS  # noqa: WPS433
+
     raw_schemas: dict = load_schemas()
     streams: list = []
 
@@ -51,4 +123,31 @@ def discover() -> Catalog:  # noqa: WPS210
                 ),
             ),
         )
-    return Catalog(streams)
+    return Catalog(streams).to_dict()
+
+
+def catalog_version() -> str:
+    """Return the version of the files the catalog is built from.
+
+    Only the files are listed, none are read or parsed.
+
+    Returns:
+        str -- Version
+    """
+    sources: List[str] = [
+        os.path.join(get_abs_path('schemas'), filename)
+        for filename in sorted(os.listdir(get_abs_path('schemas')))
+    ]
+    sources.append(get_abs_path('streams.py'))
+    sources.append(os.path.realpath(__file__))
+
+    stats: List[str] = [str(CATALOG_FORMAT)]
+    for source in sources:
+        stat: os.stat_result = os.stat(source)
+        stats.append(f'{source}:{stat.st_size}:{stat.st_mtime_ns}')
+    return '\n'.join(stats)
+
+
+if __name__ == '__main__':
+    # Compile the catalog ahead, e.g. when building an image
+    compiled_catalog()
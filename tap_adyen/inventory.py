@@ -0,0 +1,139 @@
+"""Local report inventory."""
+# -*- coding: utf-8 -*-
+import os
+import re
+import sqlite3
+import time
+from threading import Lock
+from typing import Match, Optional, Pattern
+
+# Report name of a report URL, without date or batch number
+REPORT_NAME: Pattern = re.compile(
+    r'([^/]+?)_(?:batch_\d+|\d{4}_\d{2}_\d{2})\.csv$',
+)
+
+INVENTORY_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS reports (
+    url TEXT PRIMARY KEY,
+    merchant TEXT NOT NULL,
+    report TEXT NOT NULL,
+    present INTEGER NOT NULL,
+    size INTEGER,
+    etag TEXT,
+    checked_at REAL NOT NULL,
+    processed_at REAL
+)
+"""
+
+
+class ReportInventory(object):
+    """SQLite index of the reports that were probed and processed.
+
+    Reports that were found once are not probed again, because Adyen does
+    not remove reports. Reports that were not found, such as the report of
+    today that has not been generated yet, are remembered for missing_ttl
+    seconds.
+    """
+
+    def __init__(self, path: str, missing_ttl: float = 3600) -> None:
+        """Initialize report inventory.
+
+        Arguments:
+            path {str} -- Path of the SQLite file
+
+        Keyword Arguments:
+            missing_ttl {float} -- Seconds that a missing report is not
+                probed again (default: {3600})
+        """
+        self.missing_ttl: float = missing_ttl
+
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Reports are probed from multiple threads
+        self.lock: Lock = Lock()
+        self.connection: sqlite3.Connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+        )
+        with self.lock, self.connection:
+            self.connection.execute(INVENTORY_SCHEMA)
+
+    def exists(self, url: str) -> Optional[bool]:
+        """Check whether a report is known to exist.
+
+        Arguments:
+            url {str} -- Report URL
+
+        Returns:
+            Optional[bool] -- Whether the report exists, None when it has to
+                be probed
+        """
+        with self.lock:
+            row: Optional[tuple] = self.connection.execute(
+                'SELECT present, checked_at FROM reports WHERE url = ?',
+                (url,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        present, checked_at = row
+        if present:
+            return True
+
+        # Missing reports may have been generated in the meantime
+        if time.time() - checked_at < self.missing_ttl:
+            return False
+        return None
+
+    def record(  # noqa: WPS211
+        self,
+        url: str,
+        merchant: str,
+        present: bool,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        """Record the result of a probe.
+
+        Arguments:
+            url {str} -- Report URL
+            merchant {str} -- Merchant account
+            present {bool} -- Whether the report exists
+
+        Keyword Arguments:
+            size {Optional[int]} -- Size of the report (default: {None})
+            etag {Optional[str]} -- ETag of the report (default: {None})
+        """
+        match: Optional[Match] = REPORT_NAME.search(url)
+        report: str = match.group(1) if match else url
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT INTO reports '
+                '(url, merchant, report, present, size, etag, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (url) DO UPDATE SET present = excluded.present, '
+                'size = excluded.size, etag = excluded.etag, '
+                'checked_at = excluded.checked_at',
+                (url, merchant, report, present, size, etag, time.time()),
+            )
+
+    def processed(self, url: str) -> None:
+        """Record that all rows of a report have been read.
+
+        Arguments:
+            url {str} -- Report URL
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                'UPDATE reports SET processed_at = ? WHERE url = ?',
+                (time.time(), url),
+            )
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self.lock:
+            self.connection.close()
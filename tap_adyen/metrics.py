@@ -0,0 +1,325 @@
+"""Sync metrics."""
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+import singer
+
+# Upper bounds of the request latency buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+# Upper bounds of the queue depth buckets
+DEPTH_BUCKETS: Tuple[float, ...] = (0, 1, 2, 4, 8, 16, 32, 64, 256, 1024)
+
+# Type and description of every metric
+METRICS: Dict[str, Tuple[str, str]] = {
+    'tap_adyen_request_duration_seconds': (
+        'histogram',
+        'Seconds until the response headers of a request to Adyen arrived',
+    ),
+    'tap_adyen_downloaded_bytes_total': (
+        'counter',
+        'Bytes of report bodies downloaded from Adyen',
+    ),
+    'tap_adyen_rows_cleaned_total': (
+        'counter',
+        'Report rows read and cleaned',
+    ),
+    'tap_adyen_records_emitted_total': (
+        'counter',
+        'Records written to stdout or to files',
+    ),
+    'tap_adyen_conversion_errors_total': (
+        'counter',
+        'Values that could not be converted to the type of their column',
+    ),
+    'tap_adyen_queue_depth': (
+        'histogram',
+        'Items waiting in a queue when the next item is taken',
+    ),
+}
+
+# Metric name and sorted label pairs
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics(object):
+    """Counters and histograms of a sync.
+
+    The metrics are kept in memory and exported at the end of the sync, as a
+    Prometheus textfile for the node exporter textfile collector or as Singer
+    METRIC log messages.
+    """
+
+    def __init__(self) -> None:
+        """Initialize metrics."""
+        self.counters: Dict[MetricKey, float] = {}
+        self.histograms: Dict[MetricKey, Histogram] = {}
+
+        # Metrics are updated from threads at the same time
+        self.lock: threading.Lock = threading.Lock()
+
+        # Setup logger
+        self.logger: logging.RootLogger = singer.get_logger()
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a counter.
+
+        Arguments:
+            name {str} -- Metric name
+            labels {str} -- Labels of the counter
+
+        Keyword Arguments:
+            amount {float} -- Amount to add (default: {1})
+        """
+        key: MetricKey = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(
+        self,
+        name: str,
+        measurement: float,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> None:
+        """Add a measurement to a histogram.
+
+        Arguments:
+            name {str} -- Metric name
+            measurement {float} -- Measurement
+            labels {str} -- Labels of the histogram
+
+        Keyword Arguments:
+            buckets {Tuple[float, ...]} -- Upper bounds of the buckets of a
+                new histogram (default: {LATENCY_BUCKETS})
+        """
+        key: MetricKey = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram: Histogram = self.histograms.setdefault(
+                key,
+                Histogram(buckets),
+            )
+            histogram.observe(measurement)
+
+    def textfile(self) -> str:
+        """Format the metrics in the Prometheus text format.
+
+        Returns:
+            str -- Metrics
+        """
+        lines: List[str] = []
+        with self.lock:
+            for name, (metric_type, description) in METRICS.items():
+                counters: List[Tuple[str, float]] = [
+                    (_labels(labels), amount)
+                    for (counter, labels), amount in self.counters.items()
+                    if counter == name
+                ]
+                histograms: List[Tuple[tuple, Histogram]] = [
+                    (labels, histogram)
+                    for (metric, labels), histogram in self.histograms.items()
+                    if metric == name
+                ]
+                if not counters and not histograms:
+                    continue
+
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.extend(
+                    f'{name}{labels} {_number(amount)}'
+                    for labels, amount in sorted(counters)
+                )
+                for labels, histogram in sorted(
+                    histograms,
+                    key=lambda item: item[0],
+                ):
+                    lines.extend(histogram.lines(name, labels))
+
+        return ''.join(f'{line}\n' for line in lines)
+
+    def write_textfile(self, path: str) -> None:
+        """Write the metrics to a Prometheus textfile.
+
+        The file is replaced at once, so that the collector never reads a
+        partial file.
+
+        Arguments:
+            path {str} -- Path of the textfile
+        """
+        with open(f'{path}.tmp', 'w') as textfile:
+            textfile.write(self.textfile())
+        os.replace(f'{path}.tmp', path)
+
+    def write_singer(self) -> None:
+        """Log the metrics as Singer METRIC messages.
+
+        Every message is a counter, the histograms are split into a counter
+        per bucket, a sum and a count.
+        """
+        with self.lock:
+            messages: List[dict] = [
+                {
+                    'type': 'counter',
+                    'metric': name,
+                    'value': amount,
+                    'tags': dict(labels),
+                }
+                for (name, labels), amount in sorted(self.counters.items())
+            ]
+            for (name, labels), histogram in sorted(
+                self.histograms.items(),
+                key=lambda item: item[0],
+            ):
+                messages.extend(histogram.messages(name, labels))
+
+        for message in messages:
+            self.logger.info(f'METRIC: {json.dumps(message)}')
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        """Initialize histogram.
+
+        Arguments:
+            buckets {Tuple[float, ...]} -- Upper bounds of the buckets
+        """
+        self.buckets: Tuple[float, ...] = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.total: float = 0
+
+    def observe(self, measurement: float) -> None:
+        """Add a measurement.
+
+        Arguments:
+            measurement {float} -- Measurement
+        """
+        self.counts[bisect_left(self.buckets, measurement)] += 1
+        self.total += measurement
+
+    def messages(self, name: str, labels: tuple) -> List[dict]:
+        """Format the histogram as Singer counter messages.
+
+        Singer metrics have a single number as value, so the buckets, sum
+        and count are separate counters, named like in the Prometheus text
+        format.
+
+        Arguments:
+            name {str} -- Metric name
+            labels {tuple} -- Label pairs of the histogram
+
+        Returns:
+            List[dict] -- METRIC messages
+        """
+        cumulative: List[int] = self._cumulative()
+        bounds: List[str] = [_number(bound) for bound in self.buckets]
+        bounds.append('+Inf')
+
+        counters: List[Tuple[str, tuple, float]] = [
+            (f'{name}_bucket', labels + (('le', bound),), count)
+            for bound, count in zip(bounds, cumulative)
+        ]
+        counters.append((f'{name}_sum', labels, self.total))
+        counters.append((f'{name}_count', labels, cumulative[-1]))
+        return [
+            {
+                'type': 'counter',
+                'metric': metric,
+                'value': amount,
+                'tags': dict(tags),
+            }
+            for metric, tags, amount in counters
+        ]
+
+    def lines(self, name: str, labels: tuple) -> List[str]:
+        """Format the histogram in the Prometheus text format.
+
+        Arguments:
+            name {str} -- Metric name
+            labels {tuple} -- Label pairs of the histogram
+
+        Returns:
+            List[str] -- Lines
+        """
+        cumulative: List[int] = self._cumulative()
+        bounds: List[str] = [_number(bound) for bound in self.buckets]
+        bounds.append('+Inf')
+
+        histogram_lines: List[str] = [
+            f'{name}_bucket{_labels(labels + (("le", bound),))} {count}'
+            for bound, count in zip(bounds, cumulative)
+        ]
+        histogram_lines.append(
+            f'{name}_sum{_labels(labels)} {_number(self.total)}',
+        )
+        histogram_lines.append(
+            f'{name}_count{_labels(labels)} {cumulative[-1]}',
+        )
+        return histogram_lines
+
+    def _cumulative(self) -> List[int]:
+        """Return the number of measurements up to every bucket.
+
+        Returns:
+            List[int] -- Cumulative counts, the last one is the total count
+        """
+        cumulative: List[int] = []
+        running: int = 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+def _labels(labels: tuple) -> str:
+    """Format label pairs in the Prometheus text format.
+
+    Arguments:
+        labels {tuple} -- Label pairs
+
+    Returns:
+        str -- Labels, empty without labels
+    """
+    if not labels:
+        return ''
+    pairs: str = ','.join(
+        '{0}="{1}"'.format(
+            name,
+            str(label).replace('\\', r'\\').replace('"', r'\"'),
+        )
+        for name, label in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def _number(number: float) -> str:
+    """Format a number in the Prometheus text format.
+
+    Arguments:
+        number {float} -- Number
+
+    Returns:
+        str -- Number, without a fraction when it is whole
+    """
+    if float(number).is_integer():
+        return str(int(number))
+    return repr(float(number))
@@ -0,0 +1,411 @@
+"""Sync profiler."""
+# -*- coding: utf-8 -*-
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+import singer
+
+# Stages of a sync, in the order a report passes through them
+STAGES: tuple = (
+    'probe',
+    'download',
+    'parse',
+    'clean',
+    'serialize',
+    'write',
+)
+
+
+class SyncProfiler(object):  # noqa: WPS214, WPS230
+    """Time the stages of a sync per stream and per report.
+
+    The stages are looking for reports (probe), receiving the report body
+    (download), reading the csv (parse), converting the rows (clean),
+    encoding the records as JSON (serialize) and writing them to stdout or a
+    file (write). The stages of a report are nested iterators, the time of a
+    stage does not include the time of the stages it pulls from. With
+    use_async, downloads overlap with the other stages, their time is the
+    time spent waiting for data.
+
+    Every sample_every-th report is also profiled with cProfile. At the end,
+    a JSON summary is written to path and the combined cProfile statistics
+    to path.pstats.
+    """
+
+    def __init__(self, path: str, sample_every: int = 0) -> None:
+        """Initialize sync profiler.
+
+        Arguments:
+            path {str} -- Path of the summary file
+
+        Keyword Arguments:
+            sample_every {int} -- Profile every number of reports with
+                cProfile, 0 for none (default: {0})
+        """
+        self.path: str = path
+        self.sample_every: int = sample_every
+        self.started: float = time.perf_counter()
+
+        # Seconds and calls per stage, per report URL or stream for probing
+        self.timings: Dict[str, Dict[str, List[float]]] = {}
+        self.streams: Dict[str, str] = {}
+        self.wall: Dict[str, float] = {}
+
+        # Streams may be synced in threads at the same time
+        self.lock: threading.Lock = threading.Lock()
+        self.local: threading.local = threading.local()
+
+        # Reports profiled with cProfile, only one at a time
+        self.reports: int = 0
+        self.sampled: List[str] = []
+        self.sampling: bool = False
+        self.stats: Optional[pstats.Stats] = None
+
+        # Setup logger
+        self.logger: logging.RootLogger = singer.get_logger()
+
+    @contextmanager
+    def report(
+        self,
+        stream_name: str,
+        csv_url: str,
+    ) -> Generator[None, None, None]:
+        """Attribute the records written in the context to a report.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            csv_url {str} -- Report URL
+
+        Yields:
+            Generator[None, None, None] -- Nothing
+        """
+        profile: Optional[cProfile.Profile] = None
+        with self.lock:
+            self.streams[csv_url] = stream_name
+            self.reports += 1
+            sample: bool = bool(self.sample_every) and not self.sampling and (
+                (self.reports - 1) % self.sample_every == 0
+            )
+            if sample:
+                self.sampling = True
+                profile = cProfile.Profile()
+
+        self.local.report = csv_url
+        started: float = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.local.report = None
+            with self.lock:
+                self.wall[csv_url] = time.perf_counter() - started
+                if profile is not None:
+                    self._add_profile(csv_url, profile)
+
+    def iterate(
+        self,
+        iterable: Iterable[Any],
+        stage: str,
+        report: str,
+    ) -> Iterator[Any]:
+        """Time getting the items of an iterable.
+
+        Arguments:
+            iterable {Iterable[Any]} -- Iterable
+            stage {str} -- Stage
+            report {str} -- Report URL, or stream name for probing
+
+        Returns:
+            Iterator[Any] -- Iterator of the same items
+        """
+        return TimedIterator(self, iter(iterable), stage, report)
+
+    async def aiterate(
+        self,
+        iterable: AsyncIterable[Any],
+        stage: str,
+        report: str,
+    ) -> AsyncIterator[Any]:
+        """Time waiting for the items of an asynchronous iterable.
+
+        Arguments:
+            iterable {AsyncIterable[Any]} -- Asynchronous iterable
+            stage {str} -- Stage
+            report {str} -- Report URL, or stream name for probing
+
+        Yields:
+            AsyncIterator[Any] -- The same items
+        """
+        iterator: AsyncIterator[Any] = iterable.__aiter__()
+        while True:  # noqa: WPS457
+            started: float = time.perf_counter()
+            try:
+                item: Any = await iterator.__anext__()
+            except StopAsyncIteration:
+                self.add(report, stage, time.perf_counter() - started, 0)
+                return
+            self.add(report, stage, time.perf_counter() - started)
+            yield item
+
+    def wrap(
+        self,
+        function: Callable[..., Any],
+        stage: str,
+        report: Optional[str] = None,
+    ) -> Callable[..., Any]:
+        """Time the calls of a function.
+
+        Arguments:
+            function {Callable[..., Any]} -- Function
+            stage {str} -- Stage
+
+        Keyword Arguments:
+            report {Optional[str]} -- Report URL, the report of the current
+                report context when None (default: {None})
+
+        Returns:
+            Callable[..., Any] -- Timed function
+        """
+
+        def timed(*args: Any) -> Any:  # noqa: WPS430
+            return self.call(
+                report or getattr(self.local, 'report', None) or '',
+                stage,
+                function,
+                *args,
+            )
+
+        return timed
+
+    def call(
+        self,
+        report: str,
+        stage: str,
+        function: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        """Call a function and time it as a stage.
+
+        The time of timed calls made by the function is not included.
+
+        Arguments:
+            report {str} -- Report URL, or stream name for probing
+            stage {str} -- Stage
+            function {Callable[..., Any]} -- Function
+            args {Any} -- Arguments of the function
+
+        Returns:
+            Any -- Return value of the function
+        """
+        stack: List[float] = self._stack()
+        stack.append(0)
+        calls: int = 0
+        started: float = time.perf_counter()
+        try:
+            result: Any = function(*args)
+            calls = 1
+            return result
+        finally:
+            elapsed: float = time.perf_counter() - started
+            nested: float = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.add(report, stage, elapsed - nested, calls)
+
+    def add(
+        self,
+        report: str,
+        stage: str,
+        seconds: float,
+        calls: int = 1,
+    ) -> None:
+        """Add time to a stage of a report.
+
+        Arguments:
+            report {str} -- Report URL, or stream name for probing
+            stage {str} -- Stage
+            seconds {float} -- Seconds
+
+        Keyword Arguments:
+            calls {int} -- Number of calls or items (default: {1})
+        """
+        with self.lock:
+            timing: List[float] = self.timings.setdefault(
+                report,
+                {},
+            ).setdefault(stage, [0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+
+    def summary(self) -> dict:
+        """Summarize the stage timings per stream and per report.
+
+        Returns:
+            dict -- Summary
+        """
+        streams: Dict[str, dict] = {}
+        with self.lock:
+            for report, stages in self.timings.items():
+                stream_name: str = self.streams.get(report, report)
+                stream: dict = streams.setdefault(stream_name, {
+                    'stages': {},
+                    'reports': {},
+                })
+
+                # Probing is timed per stream
+                if report != stream_name:
+                    stream['reports'][report] = {
+                        'seconds': self.wall.get(report, 0),
+                        'stages': _stage_summary(stages),
+                    }
+
+                for stage, (seconds, calls) in stages.items():
+                    total: dict = stream['stages'].setdefault(
+                        stage,
+                        {'seconds': 0, 'calls': 0},
+                    )
+                    total['seconds'] += seconds
+                    total['calls'] += calls
+
+            for stream in streams.values():
+                stream['stages'] = _stage_summary({
+                    stage: (total['seconds'], total['calls'])
+                    for stage, total in stream['stages'].items()
+                })
+
+            return {
+                'seconds': time.perf_counter() - self.started,
+                'streams': streams,
+                'profiled_reports': list(self.sampled),
+            }
+
+    def write(self) -> None:
+        """Write the summary, the cProfile statistics and log the stages."""
+        summary: dict = self.summary()
+
+        if self.stats is not None:
+            summary['pstats'] = f'{self.path}.pstats'
+            self.stats.dump_stats(summary['pstats'])
+
+        with open(self.path, 'w') as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+        for stream_name, stream in summary['streams'].items():
+            stages: str = ', '.join(
+                f'{stage} {timing["seconds"]:.3f}s'
+                for stage, timing in stream['stages'].items()
+            )
+            self.logger.info(f'Profile of {stream_name}: {stages}')
+        self.logger.info(f'Wrote the profile to: {self.path}')
+
+    def _stack(self) -> List[float]:
+        """Return the nested time of the timed calls of this thread.
+
+        Returns:
+            List[float] -- Seconds of nested timed calls per running call
+        """
+        stack: Optional[List[float]] = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = []
+            self.local.stack = stack
+        return stack
+
+    def _add_profile(self, csv_url: str, profile: cProfile.Profile) -> None:
+        """Add the cProfile statistics of a report, with the lock held.
+
+        Arguments:
+            csv_url {str} -- Report URL
+            profile {cProfile.Profile} -- Profile of the report
+        """
+        self.sampling = False
+        self.sampled.append(csv_url)
+        profile.create_stats()
+        if self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+
+
+class TimedIterator(object):
+    """Iterator that times getting every item as a stage.
+
+    Unlike a generator, it can be iterated again after it was exhausted,
+    which the csv reader of the asynchronous client relies on.
+    """
+
+    def __init__(
+        self,
+        profiler: SyncProfiler,
+        iterator: Iterator[Any],
+        stage: str,
+        report: str,
+    ) -> None:
+        """Initialize timed iterator.
+
+        Arguments:
+            profiler {SyncProfiler} -- Profiler
+            iterator {Iterator[Any]} -- Iterator
+            stage {str} -- Stage
+            report {str} -- Report URL, or stream name for probing
+        """
+        self.profiler: SyncProfiler = profiler
+        self.iterator: Iterator[Any] = iterator
+        self.stage: str = stage
+        self.report: str = report
+
+    def __iter__(self) -> 'TimedIterator':
+        """Return the iterator.
+
+        Returns:
+            TimedIterator -- The iterator
+        """
+        return self
+
+    def __next__(self) -> Any:
+        """Return the next item.
+
+        Returns:
+            Any -- Item
+        """
+        return self.profiler.call(
+            self.report,
+            self.stage,
+            next,
+            self.iterator,
+        )
+
+
+def _stage_summary(stages: Dict[str, Any]) -> Dict[str, dict]:
+    """Summarize the timings of stages, in the order of STAGES.
+
+    Arguments:
+        stages {Dict[str, Any]} -- Seconds and calls per stage
+
+    Returns:
+        Dict[str, dict] -- Seconds and calls per stage
+    """
+    return {
+        stage: {'seconds': stages[stage][0], 'calls': stages[stage][1]}
+        for stage in STAGES
+        if stage in stages
+    }
@@ -0,0 +1,356 @@
+"""Partitioned file sink."""
+# -*- coding: utf-8 -*-
+import abc
+import gzip
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Callable, Generator, List, Optional, TextIO
+
+import simplejson
+
+SINK_FORMATS: tuple = ('ndjson', 'parquet')
+
+# Rows per Parquet row group
+PARQUET_ROW_GROUP: int = 10000
+
+# Decimal precision and scale of number columns in Parquet files
+PARQUET_DECIMAL_PRECISION: int = 38
+PARQUET_DECIMAL_SCALE: int = 12
+
+
+class FileSink(object):
+    """Write cleaned records to local files instead of stdout.
+
+    Every report is written to its own file, partitioned by stream and
+    report: <output_dir>/<stream>/<report>.ndjson.gz or .parquet. A file
+    only gets its final name once the whole report has been written. The
+    manifest.json in the output directory lists the finished files and the
+    schema of every stream, so a loader can bulk-ingest whole files.
+
+    With batch_messages, a Singer BATCH message that points to the file is
+    written to stdout for every report, so that targets with batch support
+    can load the files.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        output_format: str = 'ndjson',
+        batch_messages: bool = False,
+    ) -> None:
+        """Initialize file sink.
+
+        Arguments:
+            output_dir {str} -- Directory to write the files to
+
+        Keyword Arguments:
+            output_format {str} -- 'ndjson' for gzipped newline delimited
+                JSON or 'parquet' (default: {'ndjson'})
+            batch_messages {bool} -- Whether to write BATCH messages
+                (default: {False})
+
+        Raises:
+            ValueError: Unknown output format or BATCH messages for Parquet
+        """
+        if output_format not in SINK_FORMATS:
+            raise ValueError(f'Unknown output format: {output_format}')
+        if batch_messages and output_format != 'ndjson':
+            raise ValueError('BATCH messages require the ndjson format')
+
+        self.output_dir: str = output_dir
+        self.output_format: str = output_format
+        self.batch_messages: bool = batch_messages
+        self.manifest_path: str = os.path.join(output_dir, 'manifest.json')
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Continue the manifest of earlier runs
+        self.manifest: dict = {'files': {}, 'schemas': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as manifest_file:
+                self.manifest = json.load(manifest_file)
+
+        # Streams may be synced at the same time
+        self.lock: Lock = Lock()
+
+    @contextmanager
+    def report(
+        self,
+        stream_name: str,
+        schema: dict,
+        csv_url: str,
+    ) -> Generator['ReportFile', None, None]:
+        """Open the file of a report.
+
+        The file is added to the manifest when the context exits without an
+        error, otherwise the partial file is removed.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            schema {dict} -- JSON schema of the stream
+            csv_url {str} -- The URL that points to the correct CSV file
+
+        Yields:
+            Generator[ReportFile, None, None] -- File to write records to,
+                its path is the final path once the context has exited
+        """
+        report: str = os.path.basename(csv_url).rpartition('.')[0]
+        extension: str = (
+            'parquet' if self.output_format == 'parquet' else 'ndjson.gz'
+        )
+        path: str = os.path.join(
+            self.output_dir,
+            stream_name,
+            f'{report}.{extension}',
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        report_file: ReportFile = (
+            ParquetReportFile(f'{path}.tmp', schema)
+            if self.output_format == 'parquet'
+            else NdjsonReportFile(f'{path}.tmp')
+        )
+
+        try:
+            yield report_file
+        except BaseException:
+            report_file.close()
+            os.remove(f'{path}.tmp')
+            raise
+
+        report_file.close()
+        os.replace(f'{path}.tmp', path)
+        report_file.path = path
+
+        self._add_to_manifest(stream_name, schema, {
+            'stream': stream_name,
+            'report': report,
+            'url': csv_url,
+            'path': os.path.relpath(path, self.output_dir),
+            'format': self.output_format,
+            'rows': report_file.rows,
+            'bytes': os.path.getsize(path),
+            'written_at': datetime.now(timezone.utc).isoformat(),
+        })
+
+    def _add_to_manifest(
+        self,
+        stream_name: str,
+        schema: dict,
+        entry: dict,
+    ) -> None:
+        """Add a finished file to the manifest and write the manifest.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            schema {dict} -- JSON schema of the stream
+            entry {dict} -- Manifest entry of the file
+        """
+        with self.lock:
+            self.manifest['schemas'][stream_name] = schema
+            self.manifest['files'][entry['path']] = entry
+
+            # Replace the manifest in one go
+            with open(f'{self.manifest_path}.tmp', 'w') as manifest_file:
+                json.dump(self.manifest, manifest_file, indent=2)
+            os.replace(f'{self.manifest_path}.tmp', self.manifest_path)
+
+
+class ReportFile(abc.ABC):
+    """File that the records of a single report are written to."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize report file.
+
+        Arguments:
+            path {str} -- Path of the file
+        """
+        self.path: str = path
+        self.rows: int = 0
+
+    @abc.abstractmethod
+    def write(self, record: dict) -> None:
+        """Write a record.
+
+        Arguments:
+            record {dict} -- Record
+        """
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Close the file."""
+
+
+class NdjsonReportFile(ReportFile):
+    """Gzipped newline delimited JSON file."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize gzipped newline delimited JSON file.
+
+        Arguments:
+            path {str} -- Path of the file
+        """
+        super().__init__(path)
+        self.file: TextIO = gzip.open(path, 'wt', encoding='utf-8')
+
+        # Same serialization as the Singer messages
+        self.encode: Callable[[dict], str] = simplejson.JSONEncoder(
+            use_decimal=True,
+        ).encode
+
+    def write(self, record: dict) -> None:
+        """Write a record.
+
+        Arguments:
+            record {dict} -- Record
+        """
+        self.file.write(f'{self.encode(record)}\n')
+        self.rows += 1
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+
+class ParquetReportFile(ReportFile):
+    """Parquet file, typed by the JSON schema of the stream."""
+
+    def __init__(self, path: str, schema: dict) -> None:
+        """Initialize Parquet file.
+
+        Arguments:
+            path {str} -- Path of the file
+            schema {dict} -- JSON schema of the stream
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+        super().__init__(path)
+
+        try:
+            import pyarrow  # noqa: WPS433
+            import pyarrow.parquet  # noqa: WPS433, WPS301
+        except ImportError:
+            raise ImportError(
+                'The parquet output format requires pyarrow, install it '
+                'with: pip install tap-adyen[parquet]',
+            )
+
+        self.pyarrow: Any = pyarrow
+        self.columns: List[str] = list(schema['properties'])
+        self.converters: List[Optional[Callable]] = [
+            _parquet_converter(schema['properties'][column])
+            for column in self.columns
+        ]
+        self.schema: Any = pyarrow.schema([
+            pyarrow.field(
+                column,
+                _parquet_type(pyarrow, schema['properties'][column]),
+                nullable=True,
+            )
+            for column in self.columns
+        ])
+        self.writer: Any = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.batch: List[dict] = []
+
+    def write(self, record: dict) -> None:
+        """Write a record.
+
+        Arguments:
+            record {dict} -- Record
+        """
+        self.batch.append(record)
+        self.rows += 1
+
+        if len(self.batch) >= PARQUET_ROW_GROUP:
+            self._write_batch()
+
+    def close(self) -> None:
+        """Write the last row group and close the file."""
+        if self.batch:
+            self._write_batch()
+        self.writer.close()
+
+    def _write_batch(self) -> None:
+        """Write the batched records as a row group."""
+        arrays: list = []
+        for column, converter in zip(self.columns, self.converters):
+            values: list = [record.get(column) for record in self.batch]
+            if converter:
+                values = [
+                    None if value is None else converter(value)
+                    for value in values
+                ]
+            arrays.append(values)
+
+        self.writer.write_table(
+            self.pyarrow.Table.from_arrays(
+                [
+                    self.pyarrow.array(values, type=field.type)
+                    for values, field in zip(arrays, self.schema)
+                ],
+                schema=self.schema,
+            ),
+        )
+        self.batch.clear()
+
+
+def _parquet_type(pyarrow: Any, column_schema: dict) -> Any:
+    """Map the JSON schema of a column to a Parquet column type.
+
+    Arguments:
+        pyarrow {Any} -- The pyarrow module
+        column_schema {dict} -- JSON schema of the column
+
+    Returns:
+        Any -- pyarrow data type
+    """
+    types: List[str] = _types(column_schema)
+
+    if column_schema.get('format') == 'date-time':
+        return pyarrow.timestamp('us', tz='UTC')
+    elif column_schema.get('format') == 'integer':
+        return pyarrow.int64()
+    elif 'number' in types:
+        return pyarrow.decimal128(
+            PARQUET_DECIMAL_PRECISION,
+            PARQUET_DECIMAL_SCALE,
+        )
+    elif 'boolean' in types:
+        return pyarrow.bool_()
+    return pyarrow.string()
+
+
+def _parquet_converter(column_schema: dict) -> Optional[Callable]:
+    """Return the conversion of a cleaned value for a Parquet column.
+
+    Arguments:
+        column_schema {dict} -- JSON schema of the column
+
+    Returns:
+        Optional[Callable] -- Conversion, if the value needs one
+    """
+    if column_schema.get('format') == 'date-time':
+        return datetime.fromisoformat
+    elif column_schema.get('format') == 'integer':
+        return int
+    elif 'number' in _types(column_schema):
+        return Decimal
+    return None
+
+
+def _types(column_schema: dict) -> List[str]:
+    """Return the JSON schema types of a column.
+
+    Arguments:
+        column_schema {dict} -- JSON schema of the column
+
+    Returns:
+        List[str] -- Types
+    """
+    types: Any = column_schema.get('type', [])
+    return [types] if isinstance(types, str) else list(types)
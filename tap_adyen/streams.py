@@ -1,10 +1,13 @@
 """Streams metadata."""
 # -*- coding: utf-8 -*-
-from datetime import datetime
+import re
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from types import MappingProxyType
+from typing import Optional, Pattern
 
 from dateutil.parser import parse as parse_date
+from dateutil.parser import parserinfo
 
 # Helper constants for timezone parsing
 HOUR: int = 3600
@@ -239,15 +242,47 @@ TIMEZONES: MappingProxyType = MappingProxyType({
 })
 
 
+# Adyen writes dates as: YYYY-MM-DD HH:MM:SS
+ADYEN_DATE: Pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+# Dateutil tokens, used to check which timezones it recognizes
+DATEUTIL_INFO: parserinfo = parserinfo()
+
+# Timezones of TIMEZONES that dateutil turns into a fixed offset. Dateutil
+# only accepts integer offsets and upper case names that are not AM or PM.
+ADYEN_TZINFOS: MappingProxyType = MappingProxyType({
+    name: timezone(timedelta(seconds=offset))
+    for name, offset in TIMEZONES.items()
+    if isinstance(offset, int) and name.isupper() and (
+        DATEUTIL_INFO.ampm(name) is None
+    )
+})
+
+
 def date_parser(input_date: str) -> str:
     """Help function to parse timezones correctly in strings.
 
+    Dates in the Adyen format followed by a known timezone are parsed
+    directly, anything else is parsed by dateutil.
+
     Arguments:
         input_date {str} -- Input date as string
 
     Returns:
         {str} -- Date in isoformat
     """
+    date_time, _, timezone_name = input_date.rpartition(' ')
+    tzinfo: Optional[timezone] = ADYEN_TZINFOS.get(timezone_name)
+
+    if tzinfo is not None and ADYEN_DATE.fullmatch(date_time):
+        try:
+            return datetime.fromisoformat(date_time).replace(
+                tzinfo=tzinfo,
+            ).isoformat()
+        except ValueError:
+            # Leave invalid dates to dateutil
+            pass  # noqa: WPS420
+
     parsed_date: datetime = parse_date(input_date, tzinfos=TIMEZONES)
     return parsed_date.isoformat()
 
@@ -1,26 +1,53 @@
 """Sync data."""
 # -*- coding: utf-8 -*-
+import asyncio
 import logging
-import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Callable, Optional, Union
+from functools import partial
+from itertools import count
+from threading import Lock
+from typing import (
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import singer
 from singer.catalog import Catalog, CatalogEntry
 
 from tap_adyen import tools
 from tap_adyen.adyen import Adyen
-from tap_adyen.cleaners import CLEANERS
+from tap_adyen.async_adyen import AsyncAdyen
+from tap_adyen.cleaners import CLEANER_COMPILERS, CLEANERS, ConvertionError
+from tap_adyen.metrics import DEPTH_BUCKETS, Metrics
+from tap_adyen.sink import FileSink
 from tap_adyen.streams import STREAMS
+from tap_adyen.writer import RecordWriter
 
 LOGGER: logging.RootLogger = singer.get_logger()
 
+# Maximum number of cleaned rows to buffer per report that is downloaded ahead
+ROW_BUFFER: int = 10000
 
-def sync(  # noqa: WPS210
+
+def sync(
     adyen: Adyen,
     state: dict,
     catalog: Catalog,
     start_date: str,
+    stream_workers: int = 1,
+    writer: Optional[RecordWriter] = None,
+    sink: Optional[FileSink] = None,
+    checkpoint_rows: int = 0,
 ) -> None:
     """Sync data from tap source.
 
@@ -29,6 +56,16 @@ def sync(  # noqa: WPS210
         state {dict} -- Tap state
         catalog {Catalog} -- Stream catalog
         start_date {str} -- Start date
+
+    Keyword Arguments:
+        stream_workers {int} -- Number of streams to sync at the same time
+            (default: {1})
+        writer {Optional[RecordWriter]} -- Record writer (default: {None})
+        sink {Optional[FileSink]} -- Write the records to files instead of
+            stdout, optionally with BATCH messages (default: {None})
+        checkpoint_rows {int} -- Write a checkpoint of the report every
+            number of rows, 0 to only write state after a report
+            (default: {0})
     """
     # For every stream in the catalog
     LOGGER.info('Sync')
@@ -37,6 +74,252 @@ def sync(  # noqa: WPS210
     # Only selected streams are synced, whether a stream is selected is
     # determined by whether the key-value: "selected": true is in the schema
     # file.
+    streams: List[CatalogEntry] = list(catalog.get_selected_streams(state))
+    writer = writer or RecordWriter()
+
+    # Sync the streams one after another
+    if stream_workers <= 1 or len(streams) <= 1:
+        for stream in streams:
+            sync_stream(
+                adyen,
+                state,
+                stream,
+                writer,
+                sink=sink,
+                checkpoint_rows=checkpoint_rows,
+            )
+        return
+
+    # Sync the streams at the same time. No single stream is currently
+    # syncing, the bookmarks of every stream are kept up to date instead.
+    tools.clear_currently_syncing(state)
+    output_lock: Lock = Lock()
+
+    with ThreadPoolExecutor(max_workers=stream_workers) as executor:
+        futures: List[Future] = [
+            executor.submit(
+                sync_stream,
+                adyen,
+                state,
+                stream,
+                writer,
+                output_lock,
+                sink,
+                checkpoint_rows,
+            )
+            for stream in streams
+        ]
+
+        # Raise the errors of the streams
+        for future in futures:
+            future.result()
+
+
+def sync_stream(  # noqa: WPS210
+    adyen: Adyen,
+    state: dict,
+    stream: CatalogEntry,
+    writer: RecordWriter,
+    output_lock: Optional[Lock] = None,
+    sink: Optional[FileSink] = None,
+    checkpoint_rows: int = 0,
+) -> None:
+    """Sync a single stream.
+
+    Arguments:
+        adyen {Adyen} -- Adyen client
+        state {dict} -- Tap state
+        stream {CatalogEntry} -- Stream catalog
+        writer {RecordWriter} -- Record writer
+
+    Keyword Arguments:
+        output_lock {Optional[Lock]} -- Lock around the output and the state,
+            when streams are synced at the same time (default: {None})
+        sink {Optional[FileSink]} -- Write the records to files instead of
+            stdout, optionally with BATCH messages (default: {None})
+        checkpoint_rows {int} -- Write a checkpoint of the report every
+            number of rows, 0 to only write state after a report
+            (default: {0})
+    """
+    LOGGER.info(f'Syncing stream: {stream.tap_stream_id}')
+
+    # Update the current stream as active syncing in the state
+    if output_lock is None:
+        singer.set_currently_syncing(state, stream.tap_stream_id)
+
+    # Messages of other streams may not end up in between a message
+    output: ContextManager = output_lock or nullcontext()
+
+    # Retrieve the state of the stream
+    stream_state: dict = tools.get_stream_state(
+        state,
+        stream.tap_stream_id,
+    )
+
+    LOGGER.debug(f'Stream state: {stream_state}')
+
+    # The schema and cleaner are the same for every report of the stream,
+    # only the fields selected in the catalog are cleaned and written
+    selected: Optional[FrozenSet[str]] = tools.get_selected_fields(stream)
+    schema: dict = select_schema(stream.schema.to_dict(), selected)
+    cleaner, compiler = get_cleaners(stream.tap_stream_id, selected)
+
+    # Write the schema
+    with output:
+        writer.flush()
+        singer.write_schema(
+            stream_name=stream.tap_stream_id,
+            schema=schema,
+            key_properties=stream.key_properties,
+        )
+
+    # Every stream has a corresponding method in the Adyen object e.g.:
+    # The stream: settlement_details will call: adyen.settlement_details
+    tap_urls: Callable = getattr(adyen, stream.tap_stream_id)
+
+    # The tap_urls method yields urls to CSVs. The state of the stream is
+    # used as kwargs for the method.
+    # E.g. if the state of the stream has a key 'start_date', it will be
+    # used in the method as start_date='2021-01-01T00:00:00+0000'
+    csv_urls: Iterator[str] = tap_urls(**stream_state)
+    if adyen.profiler:
+        csv_urls = adyen.profiler.iterate(
+            csv_urls,
+            'probe',
+            stream.tap_stream_id,
+        )
+
+    for csv_url in csv_urls:
+
+        # All rows of a report are extracted at the same time
+        time_extracted: datetime = datetime.now(timezone.utc)
+
+        # Rows written before an interrupted sync are skipped
+        skip_rows: int = 0 if sink else tools.get_checkpoint(
+            state,
+            stream.tap_stream_id,
+            csv_url,
+        )
+        if skip_rows:
+            LOGGER.info(f'Resuming after row {skip_rows} of: {csv_url}')
+
+        # Time the stages of the report when profiling
+        profiling: ContextManager = nullcontext()
+        if adyen.profiler:
+            profiling = adyen.profiler.report(stream.tap_stream_id, csv_url)
+
+        with profiling:
+            # Retrieve the csv
+            rows: Iterator[dict] = adyen.retrieve_csv(
+                csv_url,
+                cleaner,
+                compiler,
+                skip_rows,
+            )
+            if adyen.metrics:
+                rows = _count_rows(rows, adyen.metrics, stream.tap_stream_id)
+
+            # Write the report to a file
+            written: int = skip_rows
+            if sink:
+                with sink.report(
+                    stream.tap_stream_id,
+                    schema,
+                    csv_url,
+                ) as report_file:
+                    write_row: Callable[[dict], None] = report_file.write
+                    if adyen.profiler:
+                        write_row = adyen.profiler.wrap(write_row, 'write')
+                    for written, row in enumerate(rows, 1):
+                        write_row(row)
+
+                # Point targets with batch support to the file
+                if sink.batch_messages:
+                    with output:
+                        writer.write_batch(
+                            stream.tap_stream_id,
+                            report_file.path,
+                        )
+
+            # Write the rows to the stream
+            else:
+                for written, row in enumerate(rows, skip_rows + 1):
+                    with output:
+                        writer.write_record(
+                            stream.tap_stream_id,
+                            row,
+                            time_extracted,
+                        )
+                        write_checkpoint(
+                            writer,
+                            state,
+                            stream,
+                            csv_url,
+                            written,
+                            checkpoint_rows,
+                        )
+
+        if adyen.metrics:
+            adyen.metrics.inc(
+                'tap_adyen_records_emitted_total',
+                written - skip_rows,
+                stream=stream.tap_stream_id,
+            )
+
+        bookmark: Optional[Union[str, int]] = tools.get_bookmark_value(
+            stream.tap_stream_id,
+            csv_url,
+        )
+
+        # Remember that the report has been synced
+        if adyen.inventory:
+            adyen.inventory.processed(csv_url)
+
+        # Update bookmark, after all rows of the report have been written
+        with output:
+            writer.flush()
+            update_bookmark(stream, bookmark, state)
+
+
+async def sync_async(  # noqa: WPS210, WPS217
+    adyen: AsyncAdyen,
+    state: dict,
+    catalog: Catalog,
+    start_date: str,
+    prefetch: int = 2,
+    writer: Optional[RecordWriter] = None,
+    sink: Optional[FileSink] = None,
+    checkpoint_rows: int = 0,
+) -> None:
+    """Sync data from tap source on an event loop.
+
+    While the rows of a report are written, the next reports are already
+    being probed, downloaded and cleaned. The records and bookmarks are
+    written in the same order as the synchronous sync.
+
+    Arguments:
+        adyen {AsyncAdyen} -- Asynchronous Adyen client
+        state {dict} -- Tap state
+        catalog {Catalog} -- Stream catalog
+        start_date {str} -- Start date
+
+    Keyword Arguments:
+        prefetch {int} -- Number of reports to download ahead (default: {2})
+        writer {Optional[RecordWriter]} -- Record writer (default: {None})
+        sink {Optional[FileSink]} -- Write the records to files instead of
+            stdout, optionally with BATCH messages (default: {None})
+        checkpoint_rows {int} -- Write a checkpoint of the report every
+            number of rows, 0 to only write state after a report
+            (default: {0})
+    """
+    LOGGER.info('Sync')
+    LOGGER.debug('Current state:\n{state}')
+
+    writer = writer or RecordWriter()
+
+    # Checkpoints are only used for records written to stdout
+    checkpoints: Optional[dict] = None if sink else state
+
     for stream in catalog.get_selected_streams(state):
         LOGGER.info(f'Syncing stream: {stream.tap_stream_id}')
 
@@ -51,45 +334,432 @@ def sync(  # noqa: WPS210
 
         LOGGER.debug(f'Stream state: {stream_state}')
 
+        # The schema is the same for every report of the stream, only the
+        # fields selected in the catalog are written
+        schema: dict = select_schema(
+            stream.schema.to_dict(),
+            tools.get_selected_fields(stream),
+        )
+
         # Write the schema
+        writer.flush()
         singer.write_schema(
             stream_name=stream.tap_stream_id,
-            schema=stream.schema.to_dict(),
+            schema=schema,
             key_properties=stream.key_properties,
         )
 
-        # Every stream has a corresponding method in the Adyen object e.g.:
-        # The stream: settlement_details will call: adyen.settlement_details
-        tap_urls: Callable = getattr(adyen, stream.tap_stream_id)
+        # Reports that are being downloaded, in the order they were found
+        reports: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+        producer: asyncio.Task = asyncio.ensure_future(
+            _produce_reports(
+                adyen,
+                stream,
+                stream_state,
+                reports,
+                checkpoints,
+            ),
+        )
 
-        # The tap_urls method yields urls to CSVs. The state of the stream is
-        # used as kwargs for the method.
-        # E.g. if the state of the stream has a key 'start_date', it will be
-        # used in the method as start_date='2021-01-01T00:00:00+0000'
-        for csv_url in tap_urls(**stream_state):
+        try:
+            while True:
+                if adyen.metrics:
+                    adyen.metrics.observe(
+                        'tap_adyen_queue_depth',
+                        reports.qsize(),
+                        DEPTH_BUCKETS,
+                        queue='reports',
+                        stream=stream.tap_stream_id,
+                    )
+                report: Optional[tuple] = await reports.get()
+                if report is None:
+                    break
+                csv_url, skip_rows, rows, download = report
 
-            # Retrieve the cleaner function
-            cleaner: Optional[Callable] = CLEANERS.get(stream.tap_stream_id)
+                # All rows of a report are extracted at the same time
+                time_extracted: datetime = datetime.now(timezone.utc)
 
-            # Retrieve the csv
-            for row in adyen.retrieve_csv(csv_url, cleaner):
+                # Time the stages of the report when profiling
+                profiling: ContextManager = nullcontext()
+                if adyen.profiler:
+                    profiling = adyen.profiler.report(
+                        stream.tap_stream_id,
+                        csv_url,
+                    )
 
-                # Write a row to the stream
-                singer.write_record(
-                    stream.tap_stream_id,
-                    row,
-                    time_extracted=datetime.now(timezone.utc),
+                if adyen.metrics:
+                    adyen.metrics.observe(
+                        'tap_adyen_queue_depth',
+                        rows.qsize(),
+                        DEPTH_BUCKETS,
+                        queue='rows',
+                        stream=stream.tap_stream_id,
+                    )
+
+                # Write the rows of the report while later reports download
+                emitted: int = 0
+                with profiling:
+                    if sink:
+                        with sink.report(
+                            stream.tap_stream_id,
+                            schema,
+                            csv_url,
+                        ) as report_file:
+                            write_row: Callable[[dict], None] = (
+                                report_file.write
+                            )
+                            if adyen.profiler:
+                                write_row = adyen.profiler.wrap(
+                                    write_row,
+                                    'write',
+                                )
+                            emitted = await _drain_rows(rows, write_row)
+
+                        # Point targets with batch support to the file
+                        if sink.batch_messages:
+                            writer.write_batch(
+                                stream.tap_stream_id,
+                                report_file.path,
+                            )
+                    else:
+                        emitted = await _drain_rows(
+                            rows,
+                            partial(
+                                _write_record,
+                                writer,
+                                state,
+                                stream,
+                                csv_url,
+                                count(skip_rows + 1),
+                                checkpoint_rows,
+                                time_extracted,
+                            ),
+                        )
+
+                # Raise download errors before moving the bookmark
+                await download
+
+                if adyen.metrics:
+                    adyen.metrics.inc(
+                        'tap_adyen_records_emitted_total',
+                        emitted,
+                        stream=stream.tap_stream_id,
+                    )
+
+                bookmark: Optional[Union[str, int]] = (
+                    tools.get_bookmark_value(stream.tap_stream_id, csv_url)
                 )
-                sys.stdout.flush()
-                
 
-            bookmark: Optional[Union[str, int]] = tools.get_bookmark_value(
+                # Remember that the report has been synced
+                if adyen.inventory:
+                    adyen.inventory.processed(csv_url)
+
+                # Update bookmark, after all rows of the report are written
+                writer.flush()
+                update_bookmark(stream, bookmark, state)
+
+            # Raise probing errors
+            await producer
+        finally:
+            producer.cancel()
+
+
+async def _drain_rows(
+    rows: asyncio.Queue,
+    write: Callable[[dict], None],
+) -> int:
+    """Write the rows of a report until the end of the report.
+
+    Arguments:
+        rows {asyncio.Queue} -- Queue of cleaned rows, ends with None
+        write {Callable[[dict], None]} -- Writes a row
+
+    Returns:
+        int -- Number of rows written
+    """
+    written: int = 0
+    row: Optional[dict] = await rows.get()
+    while row is not None:
+        write(row)
+        written += 1
+        row = await rows.get()
+    return written
+
+
+async def _produce_reports(
+    adyen: AsyncAdyen,
+    stream: CatalogEntry,
+    stream_state: dict,
+    reports: asyncio.Queue,
+    checkpoints: Optional[dict] = None,
+) -> None:
+    """Start a download for every report URL of the stream.
+
+    Arguments:
+        adyen {AsyncAdyen} -- Asynchronous Adyen client
+        stream {CatalogEntry} -- Stream catalog
+        stream_state {dict} -- State of the stream
+        reports {asyncio.Queue} -- Queue of (url, skipped rows, rows,
+            download task)
+
+    Keyword Arguments:
+        checkpoints {Optional[dict]} -- State to resume reports from, None
+            to start every report at the first row (default: {None})
+    """
+    # Retrieve the cleaner function, for the fields selected in the catalog
+    cleaner, compiler = get_cleaners(
+        stream.tap_stream_id,
+        tools.get_selected_fields(stream),
+    )
+
+    try:
+        tap_urls: Callable = getattr(adyen, stream.tap_stream_id)
+        csv_urls: AsyncIterator[str] = tap_urls(**stream_state)
+        if adyen.profiler:
+            csv_urls = adyen.profiler.aiterate(
+                csv_urls,
+                'probe',
                 stream.tap_stream_id,
-                csv_url,
             )
 
-            # Update bookmark
-            update_bookmark(stream, bookmark, state)
+        async for csv_url in csv_urls:
+            # Rows written before an interrupted sync are skipped
+            skip_rows: int = 0
+            if checkpoints is not None:
+                skip_rows = tools.get_checkpoint(
+                    checkpoints,
+                    stream.tap_stream_id,
+                    csv_url,
+                )
+            if skip_rows:
+                LOGGER.info(f'Resuming after row {skip_rows} of: {csv_url}')
+
+            rows: asyncio.Queue = asyncio.Queue(maxsize=ROW_BUFFER)
+            download: asyncio.Task = asyncio.ensure_future(
+                _download_report(
+                    adyen,
+                    stream.tap_stream_id,
+                    csv_url,
+                    cleaner,
+                    compiler,
+                    rows,
+                    skip_rows,
+                ),
+            )
+            await reports.put((csv_url, skip_rows, rows, download))
+    finally:
+        await reports.put(None)
+
+
+async def _download_report(  # noqa: WPS211
+    adyen: AsyncAdyen,
+    stream_name: str,
+    csv_url: str,
+    cleaner: Optional[Callable],
+    compiler: Optional[Callable],
+    rows: asyncio.Queue,
+    skip_rows: int = 0,
+) -> None:
+    """Download and clean a report.
+
+    Arguments:
+        adyen {AsyncAdyen} -- Asynchronous Adyen client
+        stream_name {str} -- Stream name
+        csv_url {str} -- The URL that points to the correct CSV file
+        cleaner {Optional[Callable]} -- Optional cleaner function
+        compiler {Optional[Callable]} -- Optional cleaner compiler
+        rows {asyncio.Queue} -- Queue of cleaned rows, ends with None
+
+    Keyword Arguments:
+        skip_rows {int} -- Number of rows to skip (default: {0})
+    """
+    cleaned: int = 0
+    try:
+        async for row in adyen.retrieve_csv(
+            csv_url,
+            cleaner,
+            compiler,
+            skip_rows,
+        ):
+            await rows.put(row)
+            cleaned += 1
+    except ConvertionError as error:
+        if adyen.metrics:
+            _count_conversion_error(adyen.metrics, stream_name, error)
+        raise
+    finally:
+        if adyen.metrics:
+            adyen.metrics.inc(
+                'tap_adyen_rows_cleaned_total',
+                cleaned,
+                stream=stream_name,
+            )
+        await rows.put(None)
+
+
+def _count_rows(
+    rows: Iterable[dict],
+    metrics: Metrics,
+    stream_name: str,
+) -> Iterator[dict]:
+    """Count the cleaned rows of a report and its conversion errors.
+
+    Arguments:
+        rows {Iterable[dict]} -- Cleaned rows
+        metrics {Metrics} -- Metrics
+        stream_name {str} -- Stream name
+
+    Yields:
+        Iterator[dict] -- The same rows
+    """
+    cleaned: int = 0
+    try:
+        for row in rows:
+            cleaned += 1
+            yield row
+    except ConvertionError as error:
+        _count_conversion_error(metrics, stream_name, error)
+        raise
+    finally:
+        metrics.inc(
+            'tap_adyen_rows_cleaned_total',
+            cleaned,
+            stream=stream_name,
+        )
+
+
+def _count_conversion_error(
+    metrics: Metrics,
+    stream_name: str,
+    error: ConvertionError,
+) -> None:
+    """Count a value that could not be converted.
+
+    Arguments:
+        metrics {Metrics} -- Metrics
+        stream_name {str} -- Stream name
+        error {ConvertionError} -- Conversion error
+    """
+    metrics.inc(
+        'tap_adyen_conversion_errors_total',
+        stream=stream_name,
+        column=error.column or '',
+    )
+
+
+def get_cleaners(
+    tap_stream_id: str,
+    selected: Optional[FrozenSet[str]] = None,
+) -> Tuple[Optional[Callable], Optional[Callable]]:
+    """Return the cleaner and the cleaner compiler of a stream.
+
+    Arguments:
+        tap_stream_id {str} -- Stream name
+
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to clean, None for
+            every field (default: {None})
+
+    Returns:
+        Tuple[Optional[Callable], Optional[Callable]] -- Cleaner and compiler
+    """
+    cleaner: Optional[Callable] = CLEANERS.get(tap_stream_id)
+    compiler: Optional[Callable] = CLEANER_COMPILERS.get(tap_stream_id)
+
+    # Leave the other fields out of the cleaned rows
+    if selected is not None:
+        if cleaner:
+            cleaner = partial(cleaner, selected=selected)
+        if compiler:
+            compiler = partial(compiler, selected=selected)
+
+    return cleaner, compiler
+
+
+def select_schema(
+    schema: dict,
+    selected: Optional[FrozenSet[str]] = None,
+) -> dict:
+    """Limit a schema to the selected fields.
+
+    Arguments:
+        schema {dict} -- JSON schema of the stream
+
+    Keyword Arguments:
+        selected {Optional[FrozenSet[str]]} -- Fields to keep, None for
+            every field (default: {None})
+
+    Returns:
+        dict -- JSON schema
+    """
+    if selected is None:
+        return schema
+
+    return dict(schema, properties={
+        field: field_schema
+        for field, field_schema in schema.get('properties', {}).items()
+        if field in selected
+    })
+
+
+def write_checkpoint(  # noqa: WPS211
+    writer: RecordWriter,
+    state: dict,
+    stream: CatalogEntry,
+    csv_url: str,
+    written: int,
+    checkpoint_rows: int,
+) -> None:
+    """Write a checkpoint of the report every checkpoint_rows rows.
+
+    Arguments:
+        writer {RecordWriter} -- Record writer
+        state {dict} -- State
+        stream {CatalogEntry} -- Stream catalog
+        csv_url {str} -- The URL that points to the correct CSV file
+        written {int} -- Number of rows of the report written
+        checkpoint_rows {int} -- Rows between checkpoints, 0 for none
+    """
+    if not checkpoint_rows or written % checkpoint_rows:
+        return
+
+    # The checkpoint may only follow the rows it covers
+    writer.flush()
+    tools.write_checkpoint(state, stream.tap_stream_id, csv_url, written)
+    singer.write_state(state)
+
+
+def _write_record(  # noqa: WPS211
+    writer: RecordWriter,
+    state: dict,
+    stream: CatalogEntry,
+    csv_url: str,
+    written: Iterator[int],
+    checkpoint_rows: int,
+    time_extracted: datetime,
+    row: dict,
+) -> None:
+    """Write a record and a checkpoint every checkpoint_rows rows.
+
+    Arguments:
+        writer {RecordWriter} -- Record writer
+        state {dict} -- State
+        stream {CatalogEntry} -- Stream catalog
+        csv_url {str} -- The URL that points to the correct CSV file
+        written {Iterator[int]} -- Counts the rows of the report written
+        checkpoint_rows {int} -- Rows between checkpoints, 0 for none
+        time_extracted {datetime} -- Time the report was extracted
+        row {dict} -- Record
+    """
+    writer.write_record(stream.tap_stream_id, row, time_extracted)
+    write_checkpoint(
+        writer,
+        state,
+        stream,
+        csv_url,
+        next(written),
+        checkpoint_rows,
+    )
 
 
 def update_bookmark(
@@ -114,6 +784,9 @@ def update_bookmark(
             bookmark,
         )
 
+    # The report is complete, its checkpoint is no longer needed
+    tools.clear_checkpoint(state, stream.tap_stream_id)
+
     # Clear currently syncing
     tools.clear_currently_syncing(state)
 
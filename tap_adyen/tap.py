@@ -1,17 +1,27 @@
 """Adyen tap."""
 # -*- coding: utf-8 -*-
 import logging
-from argparse import Namespace
+import sys
+from argparse import (  # noqa: WPS450
+    SUPPRESS,
+    ArgumentParser,
+    Namespace,
+    _ArgumentGroup,
+)
+from importlib.metadata import version
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
 
-import pkg_resources
 from singer import get_logger, utils
 from singer.catalog import Catalog
 
-from tap_adyen.adyen import Adyen
 from tap_adyen.discover import discover
-from tap_adyen.sync import sync
 
-VERSION: str = pkg_resources.get_distribution('tap-adyen').version
+# The network and parsing modules are imported when a sync starts, so that
+# discovery and a start without work stay fast
+if TYPE_CHECKING:
+    from tap_adyen.async_adyen import AsyncAdyen
+
+VERSION: str = version('tap-adyen')
 LOGGER: logging.RootLogger = get_logger()
 REQUIRED_CONFIG_KEYS: tuple = (
     'start_date',
@@ -26,7 +36,7 @@ REQUIRED_CONFIG_KEYS: tuple = (
 def main() -> None:
     """Run tap."""
     # Parse command line arguments
-    args: Namespace = utils.parse_args(REQUIRED_CONFIG_KEYS)
+    args, profile_args = parse_args()
 
     LOGGER.info(f'>>> Running tap-adyen v{VERSION}')
 
@@ -44,16 +54,287 @@ def main() -> None:
         # Loadt the  catalog
         catalog = discover()
 
+    # Without selected streams there is nothing to set up
+    if not any(True for _ in catalog.get_selected_streams(args.state)):
+        LOGGER.info('No streams selected')
+        return
+
+    run_sync(args, profile_args, catalog)
+
+
+def run_sync(  # noqa: WPS210, WPS213
+    args: Namespace,
+    profile_args: Namespace,
+    catalog: Catalog,
+) -> None:
+    """Set up the clients and sync the catalog.
+
+    Arguments:
+        args {Namespace} -- Singer command line arguments
+        profile_args {Namespace} -- Profiling options
+        catalog {Catalog} -- Stream catalog
+    """
+    import asyncio  # noqa: WPS433
+
+    from tap_adyen.adyen import Adyen  # noqa: WPS433
+    from tap_adyen.async_adyen import AsyncAdyen  # noqa: WPS433, WPS440
+    from tap_adyen.cache import ReportCache  # noqa: WPS433
+    from tap_adyen.connection import ConnectionSettings  # noqa: WPS433
+    from tap_adyen.controller import RequestController  # noqa: WPS433
+    from tap_adyen.inventory import ReportInventory  # noqa: WPS433
+    from tap_adyen.metrics import Metrics  # noqa: WPS433
+    from tap_adyen.profiler import SyncProfiler  # noqa: WPS433
+    from tap_adyen.sink import FileSink  # noqa: WPS433
+    from tap_adyen.sync import sync  # noqa: WPS433
+    from tap_adyen.writer import RecordWriter  # noqa: WPS433
+
+    # Keep the raw reports on disk if configured
+    report_cache: Optional[ReportCache] = None
+    if args.config.get('cache_dir'):
+        report_cache = ReportCache(
+            args.config['cache_dir'],
+            int(args.config.get('cache_max_bytes', 1073741824)),
+        )
+
+    # Remember which reports exist if configured
+    inventory: Optional[ReportInventory] = None
+    if args.config.get('inventory_path'):
+        inventory = ReportInventory(
+            args.config['inventory_path'],
+            missing_ttl=float(args.config.get('inventory_missing_ttl', 3600)),
+        )
+
+    # Collect metrics of the sync if they are exported
+    metrics_textfile: Optional[str] = args.config.get('metrics_textfile')
+    metrics_singer: bool = args.config.get('metrics_singer', False)
+    metrics: Optional[Metrics] = None
+    if metrics_textfile or metrics_singer:
+        metrics = Metrics()
+
+    # Limit, throttle and retry the requests to Adyen
+    controller: RequestController = RequestController(
+        max_concurrency=int(args.config.get('request_concurrency', 32)),
+        max_retries=int(args.config.get('request_retries', 5)),
+        backoff=float(args.config.get('request_backoff', 0.5)),
+        latency_target=float(args.config.get('request_latency_target', 10)),
+        metrics=metrics,
+    )
+
+    # Connection pool and timeouts of the web client
+    connection: ConnectionSettings = ConnectionSettings(
+        http2=args.config.get('http2', True),
+        max_connections=_optional(args.config, 'max_connections', 100, int),
+        max_keepalive_connections=_optional(
+            args.config,
+            'max_keepalive_connections',
+            20,
+            int,
+        ),
+        keepalive_expiry=_optional(args.config, 'keepalive_expiry', 5),
+        connect_timeout=_optional(args.config, 'connect_timeout', 5),
+        read_timeout=_optional(args.config, 'read_timeout', 5),
+        pool_timeout=_optional(args.config, 'pool_timeout', 5),
+    )
+
+    # Time the stages of the sync if requested
+    profiler: Optional[SyncProfiler] = None
+    if profile_args.profile:
+        profiler = SyncProfiler(
+            profile_args.profile,
+            sample_every=profile_args.profile_every,
+        )
+
+    # Use the asynchronous client if configured
+    use_async: bool = args.config.get('use_async', False)
+    client_class: type = AsyncAdyen if use_async else Adyen
+
     # Initialize Adyen client
-    adyen: Adyen = Adyen(
+    adyen: Adyen = client_class(
         args.config['report_user'],
         args.config['company_account'],
         args.config['user_password'],
         args.config['merchant_account'],
         args.config.get('test', False),
+        probe_concurrency=int(args.config.get('probe_concurrency', 1)),
+        probe_strategy=args.config.get('probe_strategy', 'linear'),
+        probe_lookahead=int(args.config.get('probe_lookahead', 0)),
+        parse_workers=int(args.config.get('parse_workers', 1)),
+        parse_chunk_rows=int(args.config.get('parse_chunk_rows', 10000)),
+        report_cache=report_cache,
+        inventory=inventory,
+        controller=controller,
+        connection=connection,
+        download_window=int(args.config.get('download_window', 1)),
+        profiler=profiler,
+        metrics=metrics,
+    )
+
+    # Initialize record writer
+    writer: RecordWriter = RecordWriter(
+        max_bytes=int(args.config.get('flush_bytes', 1048576)),
+        max_seconds=float(args.config.get('flush_seconds', 1)),
+        profiler=profiler,
+    )
+
+    # Write the records to files instead of stdout if configured
+    sink: Optional[FileSink] = None
+    if args.config.get('output_dir'):
+        sink = FileSink(
+            args.config['output_dir'],
+            args.config.get('output_format', 'ndjson'),
+            batch_messages=args.config.get('batch_messages', False),
+        )
+
+    # Set up the connection before the first report
+    warm_up: bool = args.config.get('warm_up', False)
+
+    # Write a checkpoint inside a report every number of rows
+    checkpoint_rows: int = int(args.config.get('checkpoint_rows', 0))
+
+    try:
+        if use_async:
+            asyncio.run(run_async(
+                adyen,
+                args.state,
+                catalog,
+                args.config['start_date'],
+                warm_up=warm_up,
+                prefetch=int(args.config.get('prefetch_reports', 2)),
+                writer=writer,
+                sink=sink,
+                checkpoint_rows=checkpoint_rows,
+            ))
+            return
+
+        if warm_up:
+            adyen.warm_up()
+
+        sync(
+            adyen,
+            args.state,
+            catalog,
+            args.config['start_date'],
+            stream_workers=int(args.config.get('stream_workers', 1)),
+            writer=writer,
+            sink=sink,
+            checkpoint_rows=checkpoint_rows,
+        )
+
+    # Also close the inventory and write the profile and metrics of a
+    # failed sync
+    finally:
+        if inventory:
+            inventory.close()
+        if profiler:
+            profiler.write()
+        if metrics_textfile:
+            metrics.write_textfile(metrics_textfile)
+        if metrics_singer:
+            metrics.write_singer()
+
+
+async def run_async(
+    adyen: 'AsyncAdyen',
+    *args,
+    warm_up: bool = False,
+    **kwargs,
+) -> None:
+    """Run the asynchronous sync and close the client afterwards.
+
+    Arguments:
+        adyen {AsyncAdyen} -- Asynchronous Adyen client
+        args -- Positional arguments of sync_async
+
+    Keyword Arguments:
+        warm_up {bool} -- Whether to set up the connection before the first
+            report (default: {False})
+        kwargs -- Keyword arguments of sync_async
+    """
+    from tap_adyen.sync import sync_async  # noqa: WPS433
+
+    async with adyen:
+        if warm_up:
+            await adyen.warm_up()
+        await sync_async(adyen, *args, **kwargs)
+
+
+def parse_args() -> Tuple[Namespace, Namespace]:
+    """Parse the command line arguments.
+
+    The profiling options are taken from a copy of the arguments. The other
+    options are parsed by singer, which does not know the profiling options,
+    so their help is added to the help of singer.
+
+    Returns:
+        Tuple[Namespace, Namespace] -- Singer command line arguments and
+            profiling options
+    """
+    parser: ArgumentParser = _profile_parser()
+    profile_args, singer_argv = parser.parse_known_args(sys.argv[1:])
+
+    # Singer parses sys.argv, it only gets to see its own options
+    argv: List[str] = sys.argv
+    sys.argv = [argv[0], *singer_argv]
+    try:
+        args: Namespace = utils.parse_args(REQUIRED_CONFIG_KEYS)
+    except SystemExit:
+        if {'-h', '--help'}.intersection(singer_argv):
+            sys.stdout.write(f'\n{parser.format_help()}')
+        raise
+    finally:
+        sys.argv = argv
+
+    return args, profile_args
+
+
+def _profile_parser() -> ArgumentParser:
+    """Create the parser of the profiling options.
+
+    Returns:
+        ArgumentParser -- Parser of the profiling options
+    """
+    parser: ArgumentParser = ArgumentParser(
+        usage=SUPPRESS,
+        add_help=False,
+        allow_abbrev=False,
     )
+    group: _ArgumentGroup = parser.add_argument_group('profiling options')
+    group.add_argument(
+        '--profile',
+        metavar='PATH',
+        help='Time the stages of the sync and write a summary to PATH',
+    )
+    group.add_argument(
+        '--profile-every',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Also profile every N-th report with cProfile',
+    )
+    return parser
+
+
+def _optional(
+    config: dict,
+    key: str,
+    default: Optional[float],
+    convert: Callable = float,
+) -> Optional[Any]:
+    """Read an optional number from the config, where null means no limit.
+
+    Arguments:
+        config {dict} -- Tap config
+        key {str} -- Config key
+        default {Optional[float]} -- Value when the key is missing
+
+    Keyword Arguments:
+        convert {Callable} -- Conversion of the value (default: {float})
 
-    sync(adyen, args.state, catalog, args.config['start_date'])
+    Returns:
+        Optional[Any] -- Value, None when the config value is null
+    """
+    value: Any = config.get(key, default)
+    return None if value is None else convert(value)
 
 
 if __name__ == '__main__':
@@ -2,9 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from datetime import timedelta
-from typing import Optional, Union
+from typing import FrozenSet, List, Optional, Union
 
 from dateutil.parser import parse as parse_date
+from singer import metadata, should_sync_field
+from singer.catalog import CatalogEntry
 
 
 def clear_currently_syncing(state: dict) -> dict:
@@ -60,3 +62,103 @@ def get_bookmark_value(
         # Return the batch number + 1
         return int(csv_url.rstrip('.csv').rpartition('_')[2]) + 1
     return None
+
+
+def get_checkpoint(state: dict, tap_stream_id: str, csv_url: str) -> int:
+    """Return the number of rows of a report that were already written.
+
+    Arguments:
+        state {dict} -- The state
+        tap_stream_id {str} -- The id of the stream
+        csv_url {str} -- Csv url
+
+    Returns:
+        int -- Rows written before the last checkpoint, 0 without one
+    """
+    checkpoint: dict = state.get(
+        'checkpoints',
+        {},
+    ).get(tap_stream_id) or {}
+
+    # The checkpoint belongs to another report
+    if checkpoint.get('url') != csv_url:
+        return 0
+    return checkpoint.get('rows', 0)
+
+
+def write_checkpoint(
+    state: dict,
+    tap_stream_id: str,
+    csv_url: str,
+    rows: int,
+) -> None:
+    """Remember the number of rows of a report that have been written.
+
+    Checkpoints are not kept with the bookmarks, because the bookmarks of a
+    stream are passed to the Adyen client.
+
+    Arguments:
+        state {dict} -- The state
+        tap_stream_id {str} -- The id of the stream
+        csv_url {str} -- Csv url
+        rows {int} -- Rows written
+    """
+    state.setdefault('checkpoints', {})[tap_stream_id] = {
+        'url': csv_url,
+        'rows': rows,
+    }
+
+
+def clear_checkpoint(state: dict, tap_stream_id: str) -> None:
+    """Clear the checkpoint of the stream.
+
+    Arguments:
+        state {dict} -- The state
+        tap_stream_id {str} -- The id of the stream
+    """
+    checkpoints: dict = state.get('checkpoints', {})
+    checkpoints.pop(tap_stream_id, None)
+    if not checkpoints:
+        state.pop('checkpoints', None)
+
+
+def get_selected_fields(stream: CatalogEntry) -> Optional[FrozenSet[str]]:
+    """Return the fields of the stream that are selected in the catalog.
+
+    A field is selected unless its metadata deselects it. Key properties and
+    fields with automatic inclusion are always selected.
+
+    Arguments:
+        stream {CatalogEntry} -- Stream catalog
+
+    Returns:
+        Optional[FrozenSet[str]] -- Selected fields, None when every field
+            is selected
+    """
+    mdata: dict = metadata.to_map(stream.metadata or [])
+    fields: List[str] = list(stream.schema.properties or {})
+
+    selected: set = set()
+    for field in fields:
+        breadcrumb: tuple = ('properties', field)
+        default: Optional[bool] = metadata.get(
+            mdata,
+            breadcrumb,
+            'selected-by-default',
+        )
+        if should_sync_field(
+            metadata.get(mdata, breadcrumb, 'inclusion'),
+            metadata.get(mdata, breadcrumb, 'selected'),
+            default=default is not False,
+        ):
+            selected.add(field)
+
+    # The key properties are written as a string or a list
+    key_properties: Union[str, List[str]] = stream.key_properties or []
+    if isinstance(key_properties, str):
+        key_properties = [key_properties]
+    selected.update(key_properties)
+
+    if selected.issuperset(fields):
+        return None
+    return frozenset(selected)
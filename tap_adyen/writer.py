@@ -0,0 +1,155 @@
+"""Buffered record writer."""
+# -*- coding: utf-8 -*-
+import pathlib
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+import simplejson
+from singer.utils import strftime
+
+from tap_adyen.profiler import SyncProfiler
+
+
+class RecordWriter(object):
+    """Write Singer RECORD messages to stdout in large buffered chunks.
+
+    The messages are the same as the ones written by singer.write_record.
+    Only the framing is faster: the part of the message around the record is
+    serialized once per stream and time extracted, and the messages are
+    written in large chunks. The record itself is serialized with the same
+    simplejson encoder that singer uses, so Decimal values and separators
+    stay identical. The buffer is written when it reaches max_bytes or when
+    max_seconds have passed since the last write. It must be flushed before
+    any other message is written, such as SCHEMA and STATE messages.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 1048576,
+        max_seconds: float = 1.0,
+        output: Optional[TextIO] = None,
+        profiler: Optional[SyncProfiler] = None,
+    ) -> None:
+        """Initialize record writer.
+
+        Keyword Arguments:
+            max_bytes {int} -- Buffer size that triggers a write
+                (default: {1048576})
+            max_seconds {float} -- Time since the last write that triggers a
+                write (default: {1.0})
+            output {Optional[TextIO]} -- Output, defaults to stdout
+                (default: {None})
+            profiler {Optional[SyncProfiler]} -- Times the serialize and
+                write stages (default: {None})
+        """
+        self.max_bytes: int = max_bytes
+        self.max_seconds: float = max_seconds
+        self.output: Optional[TextIO] = output
+
+        self.buffer: List[str] = []
+        self.buffered: int = 0
+        self.flushed_at: float = time.monotonic()
+
+        # Same encoder as singer.format_message, reused for every record
+        self.encode: Callable[[dict], str] = simplejson.JSONEncoder(
+            use_decimal=True,
+        ).encode
+
+        # Time the serialization when profiling
+        self.profiler: Optional[SyncProfiler] = profiler
+        if profiler:
+            self.encode = profiler.wrap(self.encode, 'serialize')
+
+        # Message prefix and suffix per stream and time extracted
+        self.frames: Dict[Tuple[str, datetime], Tuple[str, str]] = {}
+
+    def write_record(
+        self,
+        stream_name: str,
+        record: dict,
+        time_extracted: datetime,
+    ) -> None:
+        """Buffer a RECORD message.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            record {dict} -- Record
+            time_extracted {datetime} -- Time the record was extracted
+        """
+        frame: Optional[Tuple[str, str]] = self.frames.get(
+            (stream_name, time_extracted),
+        )
+        if frame is None:
+            frame = self._frame(stream_name, time_extracted)
+
+        message: str = f'{frame[0]}{self.encode(record)}{frame[1]}'
+        self.buffer.append(message)
+        self.buffered += len(message)
+
+        # Write the buffer when it is full or old enough
+        if self.buffered >= self.max_bytes or (
+            time.monotonic() - self.flushed_at >= self.max_seconds
+        ):
+            self.flush()
+
+    def write_batch(self, stream_name: str, path: str) -> None:
+        """Write a BATCH message for a gzipped JSON lines file.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            path {str} -- Path of the file with the records
+        """
+        self.buffer.append(self.encode({
+            'type': 'BATCH',
+            'stream': stream_name,
+            'encoding': {'format': 'jsonl', 'compression': 'gzip'},
+            'manifest': [pathlib.Path(path).resolve().as_uri()],
+        }))
+        self.buffer.append('\n')
+        self.flush()
+
+    def flush(self) -> None:
+        """Write and flush the buffered messages."""
+        output: TextIO = self.output or sys.stdout
+
+        write: Callable[[str], int] = output.write
+        if self.profiler:
+            write = self.profiler.wrap(write, 'write')
+
+        if self.buffer:
+            write(''.join(self.buffer))
+            self.buffer.clear()
+            self.buffered = 0
+
+        output.flush()
+        self.flushed_at = time.monotonic()
+
+    def _frame(
+        self,
+        stream_name: str,
+        time_extracted: datetime,
+    ) -> Tuple[str, str]:
+        """Serialize the part of a RECORD message around the record.
+
+        Arguments:
+            stream_name {str} -- Stream name
+            time_extracted {datetime} -- Time the record was extracted
+
+        Returns:
+            Tuple[str, str] -- Message prefix and suffix
+        """
+        extracted: str = strftime(time_extracted.astimezone(timezone.utc))
+        frame: Tuple[str, str] = (
+            '{"type": "RECORD", "stream": '
+            f'{self.encode(stream_name)}, "record": ',
+            f', "time_extracted": {self.encode(extracted)}}}\n',
+        )
+
+        # Only the frames of the current reports are kept
+        if len(self.frames) > 64:  # noqa: WPS432
+            self.frames.clear()
+        self.frames[(stream_name, time_extracted)] = frame
+
+        return frame
@@ -0,0 +1,168 @@
+"""Parity of date_parser with dateutil."""
+# -*- coding: utf-8 -*-
+import random
+import warnings
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+from dateutil.parser import parse as parse_date
+from tap_adyen.streams import (
+    ADYEN_DATE,
+    ADYEN_TZINFOS,
+    TIMEZONES,
+    date_parser,
+)
+
+# Seed of the generated corpus, fixed so that failures can be reproduced
+SEED: int = 20210101
+
+# Dates per timezone name, valid and invalid
+VALID_DATES: int = 50
+INVALID_DATES: int = 25
+
+# Timezone names that are not in TIMEZONES or that dateutil treats differently
+OTHER_TIMEZONES: Tuple[str, ...] = (
+    '',
+    'AM',
+    'PM',
+    'XYZ',
+    'cet',
+    'Cet',
+    'UTC+1',
+    '+01:00',
+    '+0100',
+    '-05:30',
+)
+
+# Template of dates in the Adyen format
+ADYEN_TEMPLATE: str = (
+    '{year:04}-{month:02}-{day:02} {hour:02}:{minute:02}:{second:02}'
+)
+
+# Templates of invalid or unusual dates, filled in with random values
+INVALID_TEMPLATES: Tuple[str, ...] = (
+    '{year}-02-30 {hour:02}:{minute:02}:{second:02}',
+    '{year}-13-{day:02} {hour:02}:{minute:02}:{second:02}',
+    '{year}-00-{day:02} {hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-32 {hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-00 {hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-{day:02} 24:{minute:02}:{second:02}',
+    '{year}-{month:02}-{day:02} {hour:02}:60:{second:02}',
+    '{year}-{month:02}-{day:02} {hour:02}:{minute:02}:61',
+    '{year}-{month}-{day} {hour}:{minute}:{second}',
+    '{year}-{month:02}-{day:02}T{hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-{day:02}  {hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-{day:02} {hour:02}:{minute:02}',
+    '{year}-{month:02}-{day:02} {hour:02}:{minute:02}:{second:02}.123456',
+    '{year}/{month:02}/{day:02} {hour:02}:{minute:02}:{second:02}',
+    '{day:02}-{month:02}-{year} {hour:02}:{minute:02}:{second:02}',
+    '{year}-{month:02}-{day:02}',
+    '{year}-{month:02}-{day:02} {hour:02}:{minute:02}:{second:02} x',
+    '{year}-{month:02}-{day:02} ab:cd:ef',
+    '０{year}-{month:02}-{day:02} {hour:02}:{minute:02}:{second:02}',
+    'not a date',
+)
+
+
+@lru_cache(maxsize=None)
+def corpus() -> Dict[str, Tuple[str, ...]]:
+    """Generate the dates to compare, per timezone that follows them.
+
+    Returns:
+        Dict[str, Tuple[str, ...]] -- Dates as they could appear in an Adyen
+            report, per timezone name
+    """
+    rng: random.Random = random.Random(SEED)
+
+    def values() -> dict:  # noqa: WPS430
+        return {
+            'year': rng.randint(1, 9999),
+            'month': rng.randint(1, 12),
+            'day': rng.randint(1, 31),
+            'hour': rng.randint(0, 23),
+            'minute': rng.randint(0, 59),
+            'second': rng.randint(0, 59),
+        }
+
+    dates: Dict[str, Tuple[str, ...]] = {}
+    for timezone_name in (*TIMEZONES, *OTHER_TIMEZONES):
+        # Dates in the Adyen format, some of them on days that do not exist
+        valid: List[str] = [
+            ADYEN_TEMPLATE.format(**values()) for _ in range(VALID_DATES)
+        ]
+
+        # Dates that are not in the Adyen format
+        invalid: List[str] = [
+            rng.choice(INVALID_TEMPLATES).format(**values())
+            for _ in range(INVALID_DATES)
+        ]
+
+        dates[timezone_name] = tuple(
+            f'{date} {timezone_name}' for date in (*valid, *invalid)
+        )
+    return dates
+
+
+def parse_with_dateutil(input_date: str) -> str:
+    """Parse a date the way date_parser did before the fast path.
+
+    Arguments:
+        input_date {str} -- Input date as string
+
+    Returns:
+        str -- Date in isoformat
+    """
+    return parse_date(input_date, tzinfos=TIMEZONES).isoformat()
+
+
+def outcome(
+    parser: Callable[[str], str],
+    input_date: str,
+) -> Tuple[str, str]:
+    """Return the result of a parser, or the exception it raised.
+
+    Arguments:
+        parser {Callable[[str], str]} -- Date parser
+        input_date {str} -- Input date as string
+
+    Returns:
+        Tuple[str, str] -- Result, or the exception type and message
+    """
+    with warnings.catch_warnings():
+        # Unknown timezones give a warning in dateutil
+        warnings.simplefilter('ignore')
+        try:
+            return 'result', parser(input_date)
+        except Exception as error:  # noqa: B902
+            return type(error).__name__, str(error)
+
+
+def test_corpus_covers_every_timezone() -> None:
+    """Every timezone of TIMEZONES is in the corpus."""
+    assert set(corpus()).issuperset(TIMEZONES)
+
+
+def test_fast_path_is_taken() -> None:
+    """Every timezone of the fast path has dates in the Adyen format."""
+    for timezone_name in ADYEN_TZINFOS:
+        fast: List[str] = [
+            input_date
+            for input_date in corpus()[timezone_name]
+            if ADYEN_DATE.fullmatch(input_date.rpartition(' ')[0])
+        ]
+        assert len(fast) >= VALID_DATES, timezone_name
+
+
+@pytest.mark.parametrize('timezone_name', [*TIMEZONES, *OTHER_TIMEZONES])
+def test_parity_per_timezone(timezone_name: str) -> None:
+    """Same results and exceptions as dateutil, per timezone.
+
+    Arguments:
+        timezone_name {str} -- Timezone after the date
+    """
+    for input_date in corpus()[timezone_name]:
+        assert outcome(date_parser, input_date) == outcome(
+            parse_with_dateutil,
+            input_date,
+        ), input_date